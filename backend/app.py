@@ -1,23 +1,103 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_pymongo import PyMongo
 from flask_cors import CORS
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime, timedelta
 from functools import wraps
+import csv
+import io
+import json
+import os
+import threading
 import jwt
-from werkzeug.security import generate_password_hash, check_password_hash
+import analytics
+import archiver
+import events
+import bulk_import
+import metrics
+import migrations
+import passwords
+import queries
+import scheduler
+import serialization
+import snapshots
+import wear
+import wo_history
+from cache import TTLCache
+from counters import WoNumberAllocator
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from dotenv import load_dotenv
 
 # ---------- CONFIG ----------
+# Semua setting dari environment / file .env (lihat .env.example)
+load_dotenv()
+
 app = Flask(__name__)
+# JSON lewat orjson: ObjectId/datetime di-encode langsung (lihat serialization.py)
+app.json = serialization.OrjsonProvider(app)
+
+app.config["MONGO_URI"] = os.environ.get("MONGO_URI", "MONGO_URI_ANDA")
+app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY", 'SECRET_KEY_ANDA')
+
+# Metrics request & query MongoDB (lihat /metrics). SLOW_REQUEST_MS=500 → log request lambat + query-nya
+request_metrics = metrics.Metrics()
+metrics.init_app(
+    app, request_metrics,
+    slow_request_ms=float(os.environ["SLOW_REQUEST_MS"]) if os.environ.get("SLOW_REQUEST_MS") else None
+)
+
+# Pool koneksi MongoDB per proses worker. maxPoolSize minimal = jumlah thread per worker.
+mongo = PyMongo(
+    app,
+    maxPoolSize=int(os.environ.get("MONGO_MAX_POOL_SIZE", 50)),
+    minPoolSize=int(os.environ.get("MONGO_MIN_POOL_SIZE", 0)),
+    waitQueueTimeoutMS=int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000)),
+    event_listeners=[metrics.MongoCommandListener(request_metrics)]
+)
+CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor"])
+db = mongo.db
 
-app.config["MONGO_URI"] = "MONGO_URI_ANDA"
-app.config['SECRET_KEY'] = 'SECRET_KEY_ANDA'
+# Nomor WO dari collection counters. WO_NUMBER_BLOCK_SIZE > 1 = pre-alokasi per proses (nomor bisa loncat saat restart)
+wo_numbers = WoNumberAllocator(db, block_size=int(os.environ.get("WO_NUMBER_BLOCK_SIZE", 1)))
 
-mongo = PyMongo(app)
-CORS(app, resources={r"/api/*": {"origins": "*"}})
-db = mongo.db
+# Cache user yang login (tanpa password): cache hit = 0 query ke users.
+# update_user/delete_user membuang entry di worker ini; worker lain (dan async_app)
+# memakai data lama paling lama USER_CACHE_TTL detik.
+user_cache = TTLCache(
+    maxsize=int(os.environ.get("USER_CACHE_SIZE", 1000)),
+    ttl=float(os.environ.get("USER_CACHE_TTL", 30))
+)
 
 # ---------- JWT MIDDLEWARE ----------
+def get_cached_user(user_id):
+    user = user_cache.get(user_id)
+    if user is not None:
+        return dict(user)
+    user = db.users.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+    if user:
+        user_cache.set(user_id, user)
+    return dict(user) if user else None
+
+def user_from_token(token, scope=None):
+    """
+    Return (user, None) kalau token valid, atau (None, pesan_error).
+    scope: token login tidak punya scope; token khusus (mis. "stream") hanya berlaku untuk scope-nya.
+    """
+    try:
+        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+        if data.get('scope') != scope:
+            return None, "Token tidak valid!"
+        current_user = get_cached_user(data['user_id'])
+        if not current_user:
+            return None, "User tidak ditemukan!"
+    except jwt.ExpiredSignatureError:
+        return None, "Token sudah expired!"
+    except (jwt.InvalidTokenError, KeyError, InvalidId):
+        return None, "Token tidak valid!"
+    return current_user, None
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -34,15 +114,9 @@ def token_required(f):
         if not token:
             return jsonify({"error": "Token tidak ditemukan!"}), 401
         
-        try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = db.users.find_one({"_id": ObjectId(data['user_id'])})
-            if not current_user:
-                return jsonify({"error": "User tidak ditemukan!"}), 401
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Token sudah expired!"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Token tidak valid!"}), 401
+        current_user, error = user_from_token(token)
+        if error:
+            return jsonify({"error": error}), 401
         
         return f(current_user, *args, **kwargs)
     
@@ -67,9 +141,18 @@ def role_required(*allowed_roles):
     return decorator
 
 # ---------- AUTH ROUTES ----------
+# Hash/verifikasi password lewat process pool (lihat passwords.py); antrian penuh → 503
+password_pool = passwords.HashPool()
+
+def password_busy():
+    response = jsonify({"error": "Server sedang sibuk memproses login, coba lagi sebentar."})
+    response.status_code = 503
+    response.headers["Retry-After"] = "2"
+    return response
+
 @app.route('/api/register', methods=['POST'])
 def register():
-    data = request.json
+    data = serialization.json_body()
     username = data.get('username')
     password = data.get('password')
     role = data.get('role', 'operator')  # default: operator
@@ -85,7 +168,10 @@ def register():
     if db.users.find_one({"username": username}):
         return jsonify({"error": "Username sudah ada!"}), 400
 
-    hashed = generate_password_hash(password)
+    try:
+        hashed = password_pool.hash(password)
+    except passwords.PoolBusy:
+        return password_busy()
     db.users.insert_one({
         "username": username,
         "password": hashed,
@@ -97,7 +183,7 @@ def register():
 
 @app.route('/api/login', methods=['POST'])
 def login():
-    data = request.json
+    data = serialization.json_body()
     username = data.get('username')
     password = data.get('password')
     
@@ -106,7 +192,17 @@ def login():
     
     user = db.users.find_one({"username": username})
 
-    if user and check_password_hash(user['password'], password):
+    valid = False
+    if user:
+        try:
+            valid, new_hash = password_pool.verify(user.get('password'), password)
+        except passwords.PoolBusy:
+            return password_busy()
+        if new_hash:
+            # Method/cost hash berubah (atau hash bcrypt lama) → simpan hash baru
+            db.users.update_one({"_id": user["_id"], "password": user["password"]}, {"$set": {"password": new_hash}})
+
+    if valid:
         token = jwt.encode({
             'user_id': str(user['_id']),
             'exp': datetime.utcnow() + timedelta(hours=24)
@@ -132,18 +228,12 @@ def login():
 @role_required('admin')
 def get_all_users(current_user):
     try:
-        users = list(db.users.find({}, {"password": 0}))
+        users = db.users.find({}, {**queries.USER_SCHEMA.projection, "created_at": 1})
         result = []
         for u in users:
-            created_at = u.get("createdAt") or u.get("created_at")
-            created_at_str = created_at.isoformat() if created_at else None
-            
-            result.append({
-                "_id": str(u["_id"]),
-                "username": u["username"],
-                "role": u["role"],
-                "createdAt": created_at_str
-            })
+            item = queries.USER_SCHEMA.dump(u)
+            item["createdAt"] = item["createdAt"] or u.get("created_at")  # user lama: created_at
+            result.append(item)
         return jsonify(result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -154,7 +244,7 @@ def get_all_users(current_user):
 @token_required
 @role_required('admin')
 def update_user(current_user, user_id):
-    data = request.get_json()
+    data = serialization.json_body()
     if not data:
         return jsonify({"error": "Data kosong"}), 400
 
@@ -171,7 +261,10 @@ def update_user(current_user, user_id):
     if "password" in data and data["password"].strip():
         if len(data["password"].strip()) < 6:
             return jsonify({"error": "Password minimal 6 karakter!"}), 400
-        update_fields["password"] = generate_password_hash(data["password"].strip())
+        try:
+            update_fields["password"] = password_pool.hash(data["password"].strip())
+        except passwords.PoolBusy:
+            return password_busy()
 
     if not update_fields:
         return jsonify({"error": "Tidak ada data yang diubah"}), 400
@@ -181,6 +274,7 @@ def update_user(current_user, user_id):
             {"_id": ObjectId(user_id)},
             {"$set": update_fields}
         )
+        user_cache.invalidate(user_id)
 
         if result.matched_count == 0:
             return jsonify({"error": "User tidak ditemukan"}), 404
@@ -211,6 +305,7 @@ def delete_user(current_user, user_id):
             return jsonify({"error": "Tidak bisa menghapus akun Admin lain!"}), 403
 
         result = db.users.delete_one({"_id": ObjectId(user_id)})
+        user_cache.invalidate(user_id)
         if result.deleted_count == 0:
             return jsonify({"error": "Gagal menghapus user"}), 500
 
@@ -220,6 +315,27 @@ def delete_user(current_user, user_id):
         return jsonify({"error": str(e)}), 500
 
 
+# STATISTIK CACHE USER (Hanya Admin)
+@app.route('/api/cache/stats', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_cache_stats(current_user):
+    return jsonify({
+        "users": user_cache.stats(),
+        "dashboard_summary": summary_cache.stats()
+    }), 200
+
+
+# METRICS PROMETHEUS (per proses worker)
+# METRICS_TOKEN di-set → scraper wajib kirim "Authorization: Bearer <METRICS_TOKEN>"
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    expected = os.environ.get("METRICS_TOKEN")
+    if expected and request.headers.get('Authorization') != f"Bearer {expected}":
+        return jsonify({"error": "Token metrics salah!"}), 401
+    return Response(request_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 # (Opsional) GET PROFILE USER YANG SEDANG LOGIN
 @app.route('/api/me', methods=['GET'])
 @token_required
@@ -244,17 +360,16 @@ def get_my_profile(current_user):
 # ---------- HOME ----------
 @app.route('/')
 def home():
-    total_wo = db.workorders.count_documents({})
-    open_wo = db.workorders.count_documents({"status": {"$in": ["open", "in_progress"]}})
-    overdue = db.maintenance_schedules.count_documents({"next_due": {"$lt": datetime.now()}}) 
+    summary = get_dashboard_summary()
+    by_status = summary["workorders"]["by_status"]
     return jsonify({
         "message": "CMMS Backend SUDAH JALAN 100%!",
         "stats": {
-            "total_wo": total_wo,
-            "open_wo": open_wo,
-            "overdue_tasks": overdue,
-            "total_machines": db.machines.count_documents({}),
-            "total_components": db.components.count_documents({})
+            "total_wo": summary["workorders"]["total"],
+            "open_wo": by_status.get("open", 0) + by_status.get("in_progress", 0),
+            "overdue_tasks": summary["schedules"]["overdue"],
+            "total_machines": summary["machines"]["total"],
+            "total_components": summary["components"]["total"]
         }
     })
 
@@ -264,32 +379,14 @@ from datetime import datetime
 @app.route('/api/machines', methods=['GET'])
 @token_required
 def get_machines(current_user):
-    machines = list(db.machines.find().sort("createdAt", -1))
-    result = []
-    for m in machines:
-        install_date = m.get("installDate")
-        
-        # Konversi otomatis:
-        if isinstance(install_date, datetime):
-            install_date = install_date.isoformat()
-        
-        result.append({
-            "_id": str(m["_id"]),
-            "machineCode": m.get("machineCode", ""),
-            "machineName": m.get("machineName", ""),
-            "machineType": m.get("machineType", ""),
-            "location": m.get("location", ""),
-            "installDate": install_date,
-            "status": m.get("status", "active"),
-            "createdAt": m.get("createdAt")
-        })
-    return jsonify(result)
+    machines = db.machines.find().sort("createdAt", -1)
+    return jsonify([queries.machine_item(m) for m in machines])
 
 @app.route('/api/machines', methods=['POST'])
 @token_required
 @role_required('admin')
 def create_machine(current_user):
-    data = request.get_json()
+    data = serialization.json_body()
 
     # Validasi wajib
     required = ["machineCode", "machineName", "machineType", "location", "installDate"]
@@ -314,11 +411,25 @@ def create_machine(current_user):
     }), 201
 
 
+# === BULK IMPORT MESIN (JSON array / CSV) ===
+@app.route('/api/machines/bulk', methods=['POST'])
+@token_required
+@role_required('admin')
+def bulk_create_machines(current_user):
+    try:
+        rows = bulk_import.read_rows(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = bulk_import.import_rows(db.machines, rows, bulk_import.validate_machine)
+    return jsonify({"message": f"{result['inserted']} mesin berhasil ditambahkan!", **result}), 201
+
+
 @app.route('/api/machines/<id>', methods=['PUT'])
 @token_required
 @role_required('admin', 'supervisor')
 def update_machine(current_user, id):
-    data = request.get_json()
+    data = serialization.json_body()
     if not data:
         return jsonify({"error": "Data tidak boleh kosong"}), 400
 
@@ -342,6 +453,10 @@ def update_machine(current_user, id):
     if result.modified_count == 0:
         return jsonify({"error": "Tidak ada perubahan atau mesin tidak ditemukan"}), 400
 
+    # Ganti nama/kode → perbarui snapshot nama di semua WO mesin ini
+    if any(f in update_data for f in snapshots.MACHINE_FIELDS):
+        snapshots.propagate_machine(db, db.machines.find_one({"_id": ObjectId(id)}, queries.MACHINE_NAME_PROJECTION))
+
     return jsonify({"message": "Mesin berhasil diperbarui!"})
 
 
@@ -372,70 +487,63 @@ def get_single_machine(current_user, id):
     if not machine:
         return jsonify({"error": "Mesin tidak ditemukan"}), 404
 
-    install_date = machine.get("installDate")
-    if isinstance(install_date, datetime):
-        install_date = install_date.isoformat()
-
-    return jsonify({
-        "_id": str(machine["_id"]),
-        "machineCode": machine.get("machineCode", ""),
-        "machineName": machine.get("machineName", ""),
-        "machineType": machine.get("machineType", ""),
-        "location": machine.get("location", ""),
-        "installDate": install_date,
-        "status": machine.get("status", "active"),
-        "createdAt": machine.get("createdAt")
-    })
+    return jsonify(queries.machine_item(machine))
 
 # --- Components (Protected) ---
 @app.route('/api/components', methods=['GET'])
 @token_required
 def get_components(current_user):
-    comps = list(db.components.find())
-    for c in comps:
-        c['_id'] = str(c['_id'])
-        c['machineId'] = str(c['machineId'])
-    return jsonify(comps)
+    return jsonify(list(db.components.find()))
 
 # === GET COMPONENTS BY MACHINE ===
 @app.route('/api/machines/<machine_id>/components', methods=['GET'])
 @token_required
 def get_components_by_machine(current_user, machine_id):
     try:
-        components = list(db.components.find({"machineId": ObjectId(machine_id)}).sort("componentName", 1))
-        result = []
-        for c in components:
-
-            install_date = c.get("installDate")
-
-            # ---- FIX INVALID DATE ----
-            if isinstance(install_date, datetime):
-                install_date = install_date.isoformat() + "Z"
-            elif isinstance(install_date, str) and install_date.strip() == "":
-                install_date = None
-
-            result.append({
-                "_id": str(c["_id"]),
-                "machineId": str(c["machineId"]),
-                "componentCode": c.get("componentCode", ""),
-                "componentName": c.get("componentName", ""),
-                "installDate": install_date,
-                "status": c.get("status", "good"),
-                "lifetimeHours": c.get("lifetimeHours", 0),
-                "lifetimeCycles": c.get("lifetimeCycles", 0),
-                "notes": c.get("notes", "")
-            })
-
-        return jsonify(result)
+        components = db.components.find({"machineId": ObjectId(machine_id)}).sort("componentName", 1)
+        return jsonify([queries.component_item(c) for c in components])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# === JUMLAH & STATUS KOMPONEN BANYAK MESIN SEKALIGUS ===
+# GET /api/machines/component-stats?ids=id1,id2  (tanpa ids = semua mesin)
+@app.route('/api/machines/component-stats', methods=['GET'])
+@token_required
+def get_component_stats(current_user):
+    match = {}
+    ids = [i for i in request.args.get('ids', '').split(',') if i.strip()]
+    if ids:
+        try:
+            match["machineId"] = {"$in": [ObjectId(i.strip()) for i in ids]}
+        except InvalidId:
+            return jsonify({"error": "Ada machineId yang tidak valid"}), 400
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {"machineId": "$machineId", "status": "$status"}, "n": {"$sum": 1}}},
+        {"$group": {
+            "_id": "$_id.machineId",
+            "total": {"$sum": "$n"},
+            "by_status": {"$push": {"status": "$_id.status", "n": "$n"}}
+        }}
+    ]
+    result = {}
+    for g in db.components.aggregate(pipeline):
+        result[str(g["_id"])] = {
+            "total": g["total"],
+            "by_status": {(s["status"] or "good"): s["n"] for s in g["by_status"]}
+        }
+    # Mesin tanpa komponen tetap muncul dengan 0
+    for i in ids:
+        result.setdefault(i.strip(), {"total": 0, "by_status": {}})
+    return jsonify(result)
+
 # === CREATE COMPONENT (POST) ===
 @app.route('/api/machines/<machine_id>/components', methods=['POST'])
 @token_required
 @role_required('admin', 'supervisor', 'technician')
 def create_component(current_user, machine_id):
-    data = request.get_json()
+    data = serialization.json_body()
     
     required = ["componentCode", "componentName"]
     for field in required:
@@ -461,11 +569,89 @@ def create_component(current_user, machine_id):
     }), 201
 
 
+# === BULK IMPORT KOMPONEN UNTUK 1 MESIN (JSON array / CSV) ===
+@app.route('/api/machines/<machine_id>/components/bulk', methods=['POST'])
+@token_required
+@role_required('admin', 'supervisor', 'technician')
+def bulk_create_components(current_user, machine_id):
+    try:
+        machine_oid = ObjectId(machine_id)
+    except InvalidId:
+        return jsonify({"error": "machineId tidak valid"}), 400
+    if not db.machines.find_one({"_id": machine_oid}, {"_id": 1}):
+        return jsonify({"error": "Mesin tidak ditemukan"}), 404
+
+    try:
+        rows = bulk_import.read_rows(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = bulk_import.import_rows(
+        db.components, rows, lambda row: bulk_import.validate_component(row, machine_oid)
+    )
+    return jsonify({"message": f"{result['inserted']} komponen berhasil ditambahkan!", **result}), 201
+
+# === BULK IMPORT KOMPONEN BANYAK MESIN (kolom machineCode per baris) ===
+@app.route('/api/components/bulk', methods=['POST'])
+@token_required
+@role_required('admin', 'supervisor', 'technician')
+def bulk_create_components_all(current_user):
+    try:
+        rows = bulk_import.read_rows(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    machine_ids = {}  # machineCode → _id, diisi sekali per kode
+
+    def validate(row):
+        code = str((row.get("machineCode") if isinstance(row, dict) else None) or "").strip().upper()
+        if not code:
+            raise ValueError("Field machineCode wajib diisi!")
+        if code not in machine_ids:
+            machine = db.machines.find_one({"machineCode": code}, {"_id": 1})
+            machine_ids[code] = machine["_id"] if machine else None
+        if machine_ids[code] is None:
+            raise ValueError(f"Mesin {code} tidak ditemukan")
+        return bulk_import.validate_component(row, machine_ids[code])
+
+    result = bulk_import.import_rows(db.components, rows, validate)
+    return jsonify({"message": f"{result['inserted']} komponen berhasil ditambahkan!", **result}), 201
+
+
+# === PEMAKAIAN KOMPONEN DARI PLC (JSON array / CSV) ===
+# Baris: {"componentId", "hours", "cycles"} = counter kumulatif (jam jalan / jumlah siklus).
+# Sisa umur & status komponen yang terkena langsung dihitung ulang.
+@app.route('/api/components/usage', methods=['POST'])
+@token_required
+@role_required('admin', 'supervisor', 'technician')
+def ingest_component_usage(current_user):
+    try:
+        rows = bulk_import.read_rows(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result, component_ids = wear.ingest_usage(db, rows)
+    computed = wear.compute_wear(db, component_ids) if component_ids else {"components": 0, "updated": 0}
+    return jsonify({
+        "message": f"Pemakaian {len(component_ids)} komponen diterima",
+        **result,
+        "statusUpdated": computed["updated"]
+    }), 200
+
+
+# Hitung ulang sisa umur seluruh komponen (mis. setelah ambang WEAR_*_PCT diubah)
+@app.route('/api/components/wear/recompute', methods=['POST'])
+@token_required
+@role_required('admin')
+def recompute_component_wear(current_user):
+    return jsonify(wear.compute_wear(db)), 200
+
+
 @app.route('/api/components/<comp_id>', methods=['PUT'])
 @token_required
 @role_required('admin', 'supervisor', 'technician')
 def update_component(current_user, comp_id):
-    data = request.get_json()
+    data = serialization.json_body()
     
     if not data:
         return jsonify({"error": "Data kosong"}), 400
@@ -501,6 +687,11 @@ def update_component(current_user, comp_id):
         if result.modified_count == 0:
             return jsonify({"error": "Tidak ada perubahan atau komponen tidak ditemukan"}), 400
 
+        if "lifetimeHours" in update_data or "lifetimeCycles" in update_data:
+            wear.compute_wear(db, [ObjectId(comp_id)])
+        if any(f in update_data for f in snapshots.COMPONENT_FIELDS):
+            snapshots.propagate_component(db, db.components.find_one({"_id": ObjectId(comp_id)}, queries.COMPONENT_NAME_PROJECTION))
+
         return jsonify({"message": "Komponen berhasil diperbarui!"})
 
     except Exception as e:
@@ -523,75 +714,94 @@ def delete_component(current_user, comp_id):
 # ==============================================
 # WORK ORDERS (dengan RBAC)
 # ==============================================
+def get_name_maps(workorders):
+    """
+    Ambil nama mesin & komponen untuk WO yang belum punya snapshot nama.
+    Cukup 1 query $in per collection (bukan find_one per baris); kalau semua
+    WO sudah punya snapshot, tidak ada query sama sekali.
+    Return: ({machineId: "CODE - Name"}, {componentId: "CODE - Name"})
+    """
+    machine_ids, comp_ids = queries.referenced_ids(workorders)
+
+    machine_names = {}
+    if machine_ids:
+        for m in db.machines.find({"_id": {"$in": machine_ids}}, queries.MACHINE_NAME_PROJECTION):
+            machine_names[m["_id"]] = queries.machine_label(m)
+
+    comp_names = {}
+    if comp_ids:
+        for c in db.components.find({"_id": {"$in": comp_ids}}, queries.COMPONENT_NAME_PROJECTION):
+            comp_names[c["_id"]] = queries.component_label(c)
+
+    return machine_names, comp_names
+
 @app.route('/api/workorders', methods=['GET'])
 @token_required
 def get_workorders(current_user):
-    query = {}
-    status = request.args.get('status')
-    if status:
-        query['status'] = status
-    workorders = list(db.workorders.find(query).sort("createdAt", -1).limit(50))
-   
-    result = []
-    for wo in workorders:
-        item = {
-            "_id": str(wo["_id"]),
-            "woNumber": wo.get("woNumber", "-"),
-            "type": wo.get("type", "-"),
-            "priority": wo.get("priority", "low"),
-            "status": wo.get("status", "open"),
-            "description": wo.get("description", ""),
-            "createdAt": wo["createdAt"].isoformat() if wo.get("createdAt") else None,
-            "machineId": str(wo["machineId"]),
-            "machineName": "Unknown Machine",
-            "componentName": "-",
-            "history": [
-                {
-                    "status": h["status"],
-                    "timestamp": h["timestamp"].isoformat() if isinstance(h.get("timestamp"), datetime) else h.get("timestamp", None),
-                    "by": h.get("by", "Unknown")
-                }
-                for h in wo.get("history", [])
-            ]
-        }
-        machine = db.machines.find_one({"_id": wo["machineId"]})
-        if machine:
-            item["machineName"] = f"{machine['machineCode']} - {machine['machineName']}"
-        if wo.get("componentId"):
-            comp = db.components.find_one({"_id": wo["componentId"]})
-            if comp:
-                item["componentName"] = f"{comp['componentCode']} - {comp['componentName']}"
-        result.append(item)
-    return jsonify(result)
+    # Response tetap array (kompatibel frontend), cursor halaman berikut ada di header X-Next-Cursor
+    try:
+        limit = queries.parse_limit(request.args)
+        query = queries.keyset_query(queries.build_workorder_query(request.args), "createdAt", request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Ambil limit+1 untuk tahu masih ada halaman berikutnya atau tidak
+    workorders = list(
+        db.workorders.find(query, queries.WO_LIST_PROJECTION)
+        .sort([("createdAt", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    workorders, next_cursor = queries.split_page(workorders, limit, "createdAt")
+
+    machine_names, comp_names = get_name_maps(workorders)
+
+    result = [queries.workorder_list_item(wo, machine_names, comp_names) for wo in workorders]
+
+    response = jsonify(result)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @app.route('/api/workorders', methods=['POST'])
 @token_required
 @role_required('admin', 'supervisor', 'technician')  # Hanya role ini yang bisa buat WO
 def create_workorder(current_user):
-    data = request.json
+    data = serialization.json_body()
     
-    today = datetime.now().strftime('%Y-%m')
-    count = db.workorders.count_documents({"woNumber": {"$regex": f"^WO-{today}"}}) + 1
-    wo_number = f"WO-{today}-{str(count).zfill(4)}"
+    machine_id = ObjectId(data['machineId'])
+    component_id = ObjectId(data['componentId']) if data.get('componentId') else None
+    # Snapshot nama mesin/komponen, supaya list WO tidak perlu join
+    machine = db.machines.find_one({"_id": machine_id}, queries.MACHINE_NAME_PROJECTION)
+    comp = db.components.find_one({"_id": component_id}, queries.COMPONENT_NAME_PROJECTION) if component_id else None
+
+    wo_number = wo_numbers.next_number()
 
     new_wo = {
         "woNumber": wo_number,
-        "machineId": ObjectId(data['machineId']),
-        "componentId": ObjectId(data['componentId']) if data.get('componentId') else None,
+        "machineId": machine_id,
+        "componentId": component_id,
+        **snapshots.machine_snapshot(machine),
+        **snapshots.component_snapshot(comp),
         "type": data['type'],
         "priority": data['priority'],
         "description": data['description'],
         "status": "open",
         "createdAt": datetime.now(),
         "createdBy": current_user['username'],  # Track siapa yang buat
-        "history": [{
-            "status": "open",
-            "timestamp": datetime.now(),
-            "by": current_user['username']
-        }]
+        "updatedAt": datetime.utcnow()
+    }
+    history_entry = {
+        "status": "open",
+        "timestamp": datetime.now(),
+        "by": current_user['username']
     }
+    new_wo.update(wo_history.initial_fields(history_entry))
 
-    result = db.workorders.insert_one(new_wo)
+    try:
+        result = db.workorders.insert_one(new_wo)
+    except DuplicateKeyError:
+        return jsonify({"error": f"Nomor {wo_number} sudah dipakai, coba lagi"}), 409
+    wo_history.record(db, result.inserted_id, history_entry)
     
     return jsonify({
         "message": "Work Order berhasil dibuat",
@@ -606,36 +816,47 @@ def get_workorder_detail(current_user, id):
     if not wo:
         return jsonify({"error": "Work Order tidak ditemukan"}), 404
     
-    wo['_id'] = str(wo['_id'])
-    wo['machineId'] = str(wo['machineId'])
-    if wo.get('componentId'):
-        wo['componentId'] = str(wo['componentId'])
-    
-    machine = db.machines.find_one({"_id": ObjectId(wo['machineId'])})
-    wo['machineName'] = machine['machineName'] if machine else "-"
-    if wo.get('componentId'):
-        comp = db.components.find_one({"_id": ObjectId(wo['componentId'])})
-        wo['componentName'] = comp['componentName'] if comp else "-"
-    else:
-        wo['componentName'] = "-"
-    
-    if 'history' in wo and wo['history']:
-        for h in wo['history']:
-            if isinstance(h.get('timestamp'), datetime):
-                h['timestamp'] = h['timestamp'].isoformat()
-    if 'createdAt' in wo and isinstance(wo['createdAt'], datetime):
-        wo['createdAt'] = wo['createdAt'].isoformat()
+    # WO lama tanpa snapshot nama → ambil dari machines/components
+    machine = db.machines.find_one({"_id": wo['machineId']}) if 'machineCode' not in wo else None
+    comp = db.components.find_one({"_id": wo['componentId']}) if wo.get('componentId') and 'componentCode' not in wo else None
+    return jsonify(queries.workorder_detail(wo, machine, comp))
 
-    return jsonify(wo)
+# RIWAYAT STATUS LENGKAP (terbaru dulu, cursor halaman berikut di header X-Next-Cursor)
+@app.route('/api/workorders/<id>/history', methods=['GET'])
+@token_required
+def get_workorder_history(current_user, id):
+    try:
+        wo_id = ObjectId(id)
+    except InvalidId:
+        return jsonify({"error": "Work Order tidak ditemukan"}), 404
+    try:
+        limit = queries.parse_limit(request.args)
+        query = queries.keyset_query({"woId": wo_id}, "timestamp", request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    events = list(
+        db.workorder_events.find(query, {"woId": 0})
+        .sort([("timestamp", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    events, next_cursor = queries.split_page(events, limit, "timestamp")
+
+    response = jsonify([queries.history_item(e) for e in events])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @app.route('/api/workorders/<id>', methods=['DELETE'])
 @token_required
 @role_required('admin', 'supervisor')  # Hanya admin yang bisa hapus WO
 def delete_workorder(current_user, id):
     try:
-        result = db.workorders.delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
+        wo = db.workorders.find_one_and_delete({"_id": ObjectId(id)}, projection=analytics.ROLLUP_PROJECTION)
+        if not wo:
             return jsonify({"error": "Work Order tidak ditemukan"}), 404
+        db.workorder_events.delete_many({"woId": ObjectId(id)})
+        analytics.remove_finished(db, wo)
         return jsonify({"message": "Work Order berhasil dihapus"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -645,7 +866,38 @@ def delete_workorder(current_user, id):
 @token_required
 @role_required('admin', 'supervisor', 'technician')
 def claim_workorder(current_user, id):
-    wo = db.workorders.find_one({"_id": ObjectId(id)})
+    now = datetime.utcnow()
+    # AMBIL WO — EKSKLUSIF & ATOMIK: hanya berhasil kalau belum diambil dan status masih "open".
+    # Kalau 2 teknisi klik bersamaan, hanya 1 yang cocok dengan filter ini.
+    history_entry = {
+        "status": "in_progress",
+        "timestamp": now,
+        "by": current_user["username"],
+        "note": "WO diambil oleh teknisi"
+    }
+    wo = db.workorders.find_one_and_update(
+        {"_id": ObjectId(id), "assignedTo": None, "status": "open"},
+        {"$set": {
+            "assignedTo": current_user["_id"],
+            "assignedName": current_user["username"],
+            "assignedAt": now,
+            "status": "in_progress",  # langsung jadi in_progress
+            "updatedAt": now
+        },
+        **wo_history.push_update(history_entry)},
+        projection={"_id": 1}
+    )
+
+    if wo:
+        wo_history.record(db, wo["_id"], history_entry)
+        return jsonify({
+            "message": f"WO berhasil diambil oleh {current_user['username']}!",
+            "success": True,
+            "assignedTo": current_user["username"]
+        }), 200
+
+    # Gagal → cari tahu kenapa (hanya di jalur gagal, jadi klaim sukses tetap 1 round trip)
+    wo = db.workorders.find_one({"_id": ObjectId(id)}, {"assignedTo": 1, "assignedName": 1, "assignedAt": 1, "status": 1})
     if not wo:
         return jsonify({"error": "Work Order tidak ditemukan"}), 404
 
@@ -654,47 +906,18 @@ def claim_workorder(current_user, id):
         return jsonify({
             "error": "WO ini sudah diambil oleh teknisi lain!",
             "taken_by": wo.get("assignedName", "Orang lain"),
-            "taken_at": wo.get("assignedAt").isoformat() if wo.get("assignedAt") else None
+            "taken_at": wo.get("assignedAt")
         }), 403
 
     # CEK STATUS — HANYA BOLEH DIAMBIL KALAU MASIH "open"
-    if wo.get("status") != "open":
-        return jsonify({"error": "WO ini sudah tidak bisa diambil (status bukan open)"}), 400
-
-    # AMBIL WO — EKSKLUSIF!
-    result = db.workorders.update_one(
-        {"_id": ObjectId(id)},
-        {"$set": {
-            "assignedTo": current_user["_id"],
-            "assignedName": current_user["username"],
-            "assignedAt": datetime.utcnow(),
-            "status": "in_progress"  # langsung jadi in_progress
-        },
-        "$push": {
-            "history": {
-                "status": "in_progress",
-                "timestamp": datetime.utcnow(),
-                "by": current_user["username"],
-                "note": "WO diambil oleh teknisi"
-            }
-        }}
-    )
-
-    if result.modified_count == 0:
-        return jsonify({"error": "Gagal mengambil WO"}), 500
-
-    return jsonify({
-        "message": f"WO berhasil diambil oleh {current_user['username']}!",
-        "success": True,
-        "assignedTo": current_user["username"]
-    }), 200
+    return jsonify({"error": "WO ini sudah tidak bisa diambil (status bukan open)"}), 400
 
 
 @app.route('/api/workorders/<id>/status', methods=['PUT'])
 @token_required
 @role_required('admin', 'supervisor', 'technician')
 def update_status(current_user, id):
-    data = request.json
+    data = serialization.json_body()
     new_status = data.get('status')
     note = data.get('note', '')
 
@@ -712,16 +935,31 @@ def update_status(current_user, id):
     is_owner = assigned_to and str(assigned_to) == str(current_user["_id"])
     is_supervisor_or_admin = current_user["role"] in ['admin', 'supervisor']
 
-    # Auto-claim kalau teknisi mulai kerja (status in_progress)
+    # Auto-claim kalau teknisi mulai kerja (status in_progress) — atomik, sama seperti claim_workorder:
+    # hanya kalau belum diambil dan status masih "open", jadi dari banyak teknisi cuma 1 yang menang
     if not assigned_to and current_user["role"] == "technician" and new_status == "in_progress":
-        db.workorders.update_one(
-            {"_id": ObjectId(id)},
+        claimed = db.workorders.find_one_and_update(
+            {"_id": ObjectId(id), "assignedTo": None, "status": "open"},
             {"$set": {
                 "assignedTo": current_user["_id"],
                 "assignedName": current_user["username"],
-                "assignedAt": datetime.now()
-            }}
+                "assignedAt": datetime.now(),
+                "updatedAt": datetime.utcnow()
+            }},
+            projection={"assignedTo": 1, "assignedName": 1},
+            return_document=ReturnDocument.AFTER
         )
+        if not claimed:
+            # Keduluan teknisi lain di antara find_one dan update, atau status WO sudah bukan "open"
+            wo = db.workorders.find_one({"_id": ObjectId(id)}) or wo
+            if not wo.get("assignedTo"):
+                return jsonify({"error": f"WO berstatus {wo.get('status')}, tidak bisa diambil"}), 409
+            if str(wo["assignedTo"]) != str(current_user["_id"]):
+                return jsonify({
+                    "error": "WO ini sudah diambil oleh teknisi lain!",
+                    "taken_by": wo.get("assignedName", "Orang lain"),
+                    "taken_at": wo.get("assignedAt")
+                }), 403
         is_owner = True
 
     # Hanya owner, supervisor, atau admin yang boleh ubah
@@ -746,13 +984,32 @@ def update_status(current_user, id):
     if note:
         history_entry["note"] = note
 
+    update_fields = {"status": new_status, "updatedAt": datetime.utcnow()}
+    if new_status == "closed":
+        update_fields["closedAt"] = history_entry["timestamp"]  # dipakai auto-archiver
+
     result = db.workorders.update_one(
         {"_id": ObjectId(id)},
-        {"$set": {"status": new_status}, "$push": {"history": history_entry}}
+        {"$set": update_fields, **wo_history.push_update(history_entry)}
     )
 
     if result.modified_count == 0:
         return jsonify({"error": "Gagal update status"}), 500
+    wo_history.record(db, wo["_id"], history_entry)
+    if new_status in analytics.FINISHED_STATUSES:
+        analytics.record_finished(db, wo["_id"])  # rollup MTTR/MTBF (sekali per WO)
+
+    # WO preventive dari scheduler selesai → catat last_done di jadwalnya
+    # (next_due sudah dimajukan scheduler saat WO dibuat)
+    if new_status in ("completed", "closed") and wo.get("scheduleId"):
+        db.maintenance_schedules.update_one(
+            {"_id": wo["scheduleId"], "last_done": {"$lt": history_entry["timestamp"]}},
+            {"$set": {
+                "last_done": history_entry["timestamp"],
+                "lastCompletedBy": current_user["username"],
+                "updatedAt": datetime.utcnow()
+            }}
+        )
 
     return jsonify({
         "message": f"Status berhasil diubah menjadi {new_status}",
@@ -770,78 +1027,214 @@ def archive_workorder(current_user, id):
     if wo["status"] not in ["completed", "closed"]:
         return jsonify({"error": "Hanya WO yang COMPLETED atau CLOSED yang bisa diarsipkan"}), 400
     
-    db.workorders_archive.insert_one(wo)
-    db.workorders.delete_one({"_id": ObjectId(id)})
+    archiver.archive_workorders(db, [wo["_id"]], current_user["username"])
     
     return jsonify({"message": "Work Order berhasil diarsipkan"})
 
+def parse_id_list(data, maximum=500):
+    """Ambil list ObjectId dari body {"ids": [...]}. Raise ValueError kalau tidak valid."""
+    ids = (data or {}).get("ids")
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("Field ids (list) wajib diisi!")
+    if len(ids) > maximum:
+        raise ValueError(f"Maksimal {maximum} WO per request")
+    try:
+        return list(dict.fromkeys(ObjectId(i) for i in ids))
+    except (InvalidId, TypeError):
+        raise ValueError("Ada id yang tidak valid")
+
+# ARSIP BANYAK WO SEKALIGUS
+@app.route('/api/workorders/archive/bulk', methods=['POST'])
+@token_required
+@role_required('admin', 'supervisor')
+def bulk_archive_workorders(current_user):
+    try:
+        ids = parse_id_list(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    archived, skipped = archiver.archive_workorders(db, ids, current_user["username"])
+    return jsonify({
+        "message": f"{archived} Work Order berhasil diarsipkan",
+        "archived": archived,
+        "skipped": skipped
+    })
+
+# RESTORE BANYAK WO SEKALIGUS
+@app.route('/api/workorders/archive/bulk-restore', methods=['POST'])
+@token_required
+@role_required('admin', 'supervisor')
+def bulk_restore_workorders(current_user):
+    try:
+        ids = parse_id_list(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    restored, skipped = archiver.restore_workorders(db, ids)
+    return jsonify({
+        "message": f"{restored} Work Order berhasil dikembalikan ke aktif!",
+        "restored": restored,
+        "skipped": skipped
+    })
+
+
 @app.route('/api/workorders/archive', methods=['GET'])
 @token_required
 @role_required('admin', 'supervisor', 'technician')
 def get_archived_workorders(current_user):
-    archived = list(db.workorders_archive.find().sort([("history.timestamp", -1)]))
-    
-    result = []
-    for wo in archived:
-        item = wo.copy()
-        item['_id'] = str(item['_id'])
-        item['machineId'] = str(item['machineId'])
-        if item.get('componentId'):
-            item['componentId'] = str(item['componentId'])
-        
-        machine = db.machines.find_one({"_id": ObjectId(item['machineId'])})
-        item['machineName'] = f"{machine['machineCode']} - {machine['machineName']}" if machine else "Unknown"
-        
-        if item.get('componentId'):
-            comp = db.components.find_one({"_id": ObjectId(item['componentId'])})
-            item['componentName'] = f"{comp['componentCode']} - {comp['componentName']}" if comp else "-"
-        else:
-            item['componentName'] = "-"
-        
-        if 'history' in item:
-            for h in item['history']:
-                if isinstance(h.get('timestamp'), datetime):
-                    h['timestamp'] = h['timestamp'].isoformat()
-        if isinstance(item.get('createdAt'), datetime):
-            item['createdAt'] = item['createdAt'].isoformat()
-            
-        result.append(item)
-    
-    return jsonify(result)
+    # Sama seperti list WO: array + cursor halaman berikut di header X-Next-Cursor
+    try:
+        limit = queries.parse_limit(request.args)
+        query = queries.keyset_query({}, "archivedAt", request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    archived = list(
+        db.workorders_archive.find(query, queries.ARCHIVE_LIST_PROJECTION)
+        .sort([("archivedAt", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    archived, next_cursor = queries.split_page(archived, limit, "archivedAt")
+
+    machine_names, comp_names = get_name_maps(archived)
+
+    result = [queries.archive_list_item(wo, machine_names, comp_names) for wo in archived]
+
+    response = jsonify(result)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @app.route('/api/workorders/archive/<id>/restore', methods=['POST'])
 @token_required
 @role_required('admin', 'supervisor')
 def restore_workorder(current_user, id):
     try:
-        archived_wo = db.workorders_archive.find_one({"_id": ObjectId(id)})
-        if not archived_wo:
-            return jsonify({"error": "WO tidak ditemukan di arsip"}), 404
-        
-        existing = db.workorders.find_one({"_id": ObjectId(id)})
-        if existing:
+        restored, skipped = archiver.restore_workorders(db, [ObjectId(id)])
+        if skipped and skipped[0]["reason"] == "sudah ada di aktif":
             return jsonify({"error": "WO sudah ada di aktif"}), 400
-        
-        db.workorders.insert_one(archived_wo)
-        db.workorders_archive.delete_one({"_id": ObjectId(id)})
-        
+        if not restored:
+            return jsonify({"error": "WO tidak ditemukan di arsip"}), 404
+
         return jsonify({"message": "Work Order berhasil dikembalikan ke aktif!"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# --- Dashboard Summary ---
+# Dipakai bersama semua dashboard: 1x hitung per DASHBOARD_CACHE_TTL detik
+summary_cache = TTLCache(maxsize=1, ttl=float(os.environ.get("DASHBOARD_CACHE_TTL", 15)))
+summary_lock = threading.Lock()
+
+def count_schedule_buckets():
+    """
+    Hitung jadwal overdue / hari ini / 7 hari ke depan langsung di MongoDB
+    (range query di index next_due, bukan loop Python).
+    next_due string lama sudah dinormalisasi ke datetime oleh migrasi 3.
+    """
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    tomorrow = today + timedelta(days=1)
+    week_end = today + timedelta(days=8)  # sampai H+7
+
+    # Tiap count = COUNT_SCAN di index next_due (sub-pipeline $facet tidak bisa pakai index)
+    schedules = db.maintenance_schedules
+    return {
+        "total": schedules.estimated_document_count(),
+        "overdue": schedules.count_documents({"next_due": {"$lt": today}}),
+        "due_today": schedules.count_documents({"next_due": {"$gte": today, "$lt": tomorrow}}),
+        "due_soon": schedules.count_documents({"next_due": {"$gte": tomorrow, "$lt": week_end}})
+    }
+
+def compute_dashboard_summary():
+    wo = next(db.workorders.aggregate([
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "by_status": [{"$group": {"_id": "$status", "n": {"$sum": 1}}}],
+            "by_priority": [{"$group": {"_id": "$priority", "n": {"$sum": 1}}}]
+        }}
+    ]))
+
+    return {
+        "workorders": {
+            "total": wo["total"][0]["n"] if wo["total"] else 0,
+            "by_status": {g["_id"]: g["n"] for g in wo["by_status"] if g["_id"]},
+            "by_priority": {g["_id"]: g["n"] for g in wo["by_priority"] if g["_id"]}
+        },
+        "schedules": count_schedule_buckets(),
+        "machines": {"total": db.machines.estimated_document_count()},
+        "components": {"total": db.components.estimated_document_count()},
+        "generatedAt": datetime.utcnow().isoformat() + "Z"
+    }
+
+def get_dashboard_summary():
+    summary = summary_cache.get("summary")
+    if summary is None:
+        # Hanya 1 thread yang hitung ulang, sisanya menunggu hasilnya
+        with summary_lock:
+            summary = summary_cache.get("summary")
+            if summary is None:
+                summary = compute_dashboard_summary()
+                summary_cache.set("summary", summary)
+    return summary
+
+@app.route('/api/dashboard/summary', methods=['GET'])
+@token_required
+def dashboard_summary(current_user):
+    return jsonify(get_dashboard_summary())
+
+# --- Analitik keandalan (MTTR / MTBF / backlog, lihat analytics.py) ---
+def month_param(name, default):
+    value = request.args.get(name) or default
+    datetime.strptime(value, "%Y-%m")  # ValueError kalau format salah
+    return value
+
+@app.route('/api/analytics/reliability', methods=['GET'])
+@token_required
+def reliability(current_user):
+    group_by = request.args.get('groupBy', 'machine')
+    if group_by not in analytics.GROUP_FIELDS:
+        return jsonify({"error": "groupBy harus machine, component atau month"}), 400
+    now = datetime.now()
+    try:
+        # Default 12 bulan terakhir (termasuk bulan ini)
+        start = month_param('from', f"{now.year - 1}-{now.month + 1:02d}" if now.month < 12 else f"{now.year}-01")
+        end = month_param('to', now.strftime("%Y-%m"))
+        machine_id = ObjectId(request.args['machineId']) if request.args.get('machineId') else None
+    except ValueError:
+        return jsonify({"error": "from/to harus format YYYY-MM"}), 400
+    except InvalidId:
+        return jsonify({"error": "machineId tidak valid"}), 400
+    if start > end:
+        return jsonify({"error": "from harus <= to"}), 400
+
+    rows = analytics.reliability_report(db, start, end, group_by, machine_id)
+    backlog = analytics.backlog(db, group_by, machine_id, now)
+    if group_by in ("machine", "component"):
+        for row in rows:
+            row["backlog"] = backlog.pop(row["key"], None)
+    return jsonify({
+        "from": start,
+        "to": end,
+        "groupBy": group_by,
+        "rows": rows,
+        # group machine/component: backlog yang belum punya riwayat selesai di periode ini
+        "backlog": backlog.get(None) if group_by == "month" else [{"key": k, **v} for k, v in backlog.items()]
+    })
+
+@app.route('/api/analytics/rebuild', methods=['POST'])
+@token_required
+@role_required('admin')
+def rebuild_analytics(current_user):
+    rollups = analytics.rebuild_rollups(db)
+    return jsonify({"message": f"Rollup analitik dihitung ulang ({rollups} dokumen)", "rollups": rollups})
+
 # --- Alerts ---
 @app.route('/api/dashboard/alerts')
 @token_required
 def alerts(current_user):
+    # 10 jadwal yang paling lama lewat jatuh tempo
     alerts = list(db.maintenance_schedules.find({
         "next_due": {"$lte": datetime.now()}
-    }).limit(10))
-    
-    for a in alerts:
-        a['_id'] = str(a['_id'])
-        a['machineId'] = str(a['machineId'])
-        if a.get('componentId'):
-            a['componentId'] = str(a['componentId'])
+    }).sort("next_due", 1).limit(10))
     return jsonify(alerts)
 
 # ==============================================
@@ -851,7 +1244,7 @@ def alerts(current_user):
 @token_required
 @role_required('admin', 'supervisor')
 def create_schedule(current_user):
-    data = request.json
+    data = serialization.json_body()
     last_done = datetime.fromisoformat(data['last_done'].replace('Z', '+00:00'))
     frequency = int(data['frequency_days'])
     next_due = last_done + timedelta(days=frequency)
@@ -864,7 +1257,8 @@ def create_schedule(current_user):
         "last_done": last_done,
         "next_due": next_due,
         "createdAt": datetime.now(),
-        "createdBy": current_user['username']
+        "createdBy": current_user['username'],
+        "updatedAt": datetime.utcnow()
     }
     result = db.maintenance_schedules.insert_one(schedule)
     return jsonify({"message": "Jadwal berhasil dibuat!", "id": str(result.inserted_id)}), 201
@@ -872,31 +1266,9 @@ def create_schedule(current_user):
 @app.route('/api/schedules', methods=['GET'])
 @token_required
 def get_schedules(current_user):
-    schedules = list(db.maintenance_schedules.find())
+    schedules = db.maintenance_schedules.find()
     today = datetime.now().date()
-    result = []
-
-    for s in schedules:
-        next_due = s['next_due'].date()
-        days_left = (next_due - today).days
-        
-        status = "on_track"
-        if days_left < 0:
-            status = "overdue"
-        elif days_left <= 7:
-            status = "due_soon"
-
-        result.append({
-            "_id": str(s['_id']),
-            "machineName": s['machineName'],
-            "task": s['task'],
-            "frequency_days": s['frequency_days'],
-            "last_done": s['last_done'].strftime("%d %b %Y"),
-            "next_due": s['next_due'].strftime("%d %b %Y"),
-            "days_left": days_left,
-            "status": status
-        })
-    return jsonify(result)
+    return jsonify([queries.schedule_item(s, today) for s in schedules])
 
 # @app.route('/api/schedules/<id>/complete', methods=['POST'])
 # @token_required
@@ -919,6 +1291,14 @@ def get_schedules(current_user):
 #     )
 #     return jsonify({"message": "Maintenance selesai! Jadwal diperbarui."})
 
+# Jalankan scheduler sekarang (biasanya otomatis tiap SCHEDULER_INTERVAL_SECONDS)
+@app.route('/api/schedules/sweep', methods=['POST'])
+@token_required
+@role_required('admin', 'supervisor')
+def sweep_schedules(current_user):
+    result = scheduler.sweep_due_schedules(db)
+    return jsonify({"message": f"{result['created']} WO preventive dibuat", **result}), 200
+
 @app.route('/api/schedules/<id>', methods=['GET'])
 @token_required
 def get_single_schedule(current_user, id):
@@ -927,11 +1307,6 @@ def get_single_schedule(current_user, id):
         if not schedule:
             return jsonify({"error": "Jadwal tidak ditemukan"}), 404
         
-        schedule["_id"] = str(schedule["_id"])
-        schedule["machineId"] = str(schedule["machineId"])
-        schedule["last_done"] = schedule["last_done"].isoformat()
-        schedule["next_due"] = schedule["next_due"].isoformat()
-        
         return jsonify(schedule)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -941,7 +1316,7 @@ def get_single_schedule(current_user, id):
 @role_required('admin', 'supervisor')
 def update_schedule(current_user, id):
     try:
-        data = request.json
+        data = serialization.json_body()
         last_done = datetime.fromisoformat(data['last_done'].replace('Z', '+00:00'))
         frequency = int(data['frequency_days'])
         next_due = last_done + timedelta(days=frequency)
@@ -952,7 +1327,8 @@ def update_schedule(current_user, id):
             "task": data['task'],
             "frequency_days": frequency,
             "last_done": last_done,
-            "next_due": next_due
+            "next_due": next_due,
+            "updatedAt": datetime.utcnow()
         }
 
         result = db.maintenance_schedules.update_one(
@@ -983,26 +1359,12 @@ def delete_schedule(current_user, id):
 @token_required
 def get_maintenance_stats(current_user):
     try:
-        schedules = list(db.maintenance_schedules.find())
-        today = datetime.now().date()
-        
-        overdue = 0
-        due_today = 0
-        soon = 0
-        
-        for s in schedules:
-            due = s['next_due'].date() if hasattr(s['next_due'], 'date') else datetime.fromisoformat(str(s['next_due'])).date()
-            days = (due - today).days
-            
-            if days < 0: overdue += 1
-            elif days == 0: due_today += 1
-            elif days <= 7: soon += 1
-        
+        buckets = count_schedule_buckets()
         return jsonify({
-            "overdue_maintenance": overdue,
-            "due_today": due_today,
-            "upcoming_soon": soon,
-            "total_schedules": len(schedules)
+            "overdue_maintenance": buckets["overdue"],
+            "due_today": buckets["due_today"],
+            "upcoming_soon": buckets["due_soon"],
+            "total_schedules": buckets["total"]
         })
         
     except Exception as e:
@@ -1016,23 +1378,238 @@ def get_maintenance_history(current_user):
     if machine_id:
         query["machineId"] = ObjectId(machine_id)
     
-    history = list(db.maintenance_schedules.find(query).sort("last_done", -1))
-    
-    result = []
-    for h in history:
-        result.append({
-            "_id": str(h["_id"]),
-            "machineId": str(h["machineId"]),
-            "machineName": h["machineName"],
-            "task": h["task"],
-            "frequency_days": h["frequency_days"],
-            "last_done": h["last_done"].strftime("%d %B %Y"),
-            "next_due": h["next_due"].strftime("%d %B %Y"),
-            "status": "Selesai" if h["next_due"] > datetime.now() else "Terjadwal"
-        })
-    
-    return jsonify(result)
+    now = datetime.now()
+    history = db.maintenance_schedules.find(query, queries.MAINTENANCE_HISTORY_SCHEMA.projection).sort("last_done", -1)
+    return jsonify([queries.maintenance_history_item(h, now) for h in history])
+
+# ==============================================
+# EXPORT (STREAMING NDJSON / CSV)
+# ==============================================
+# Data dibaca dari cursor per batch dan langsung dikirim → memori tetap kecil
+# walaupun export setahun penuh.
+EXPORT_BATCH_SIZE = 500
+
+WO_EXPORT_COLUMNS = [
+    "_id", "woNumber", "type", "priority", "status", "description",
+    "machineId", "machineName", "componentId", "componentName",
+    "assignedName", "createdBy", "createdAt", "closedAt"
+]
+
+EXPORTS = {
+    "workorders": {
+        "collection": "workorders",
+        "sort": [("createdAt", -1), ("_id", -1)],
+        "columns": WO_EXPORT_COLUMNS,
+        "with_names": True
+    },
+    "archive": {
+        "collection": "workorders_archive",
+        "sort": [("archivedAt", -1), ("_id", -1)],
+        "columns": WO_EXPORT_COLUMNS + ["archivedAt", "archivedBy"],
+        "with_names": True
+    },
+    "maintenance-history": {
+        "collection": "maintenance_schedules",
+        "sort": [("last_done", -1)],
+        "columns": ["_id", "machineId", "machineName", "task", "frequency_days", "last_done", "next_due"],
+        "with_names": False
+    }
+}
+
+def export_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat() + "Z"  # naive = UTC, sama dengan response JSON
+    return value
+
+def build_export_query(name):
+    if name == "maintenance-history":
+        machine_id = request.args.get('machineId')
+        if not machine_id:
+            return {}
+        try:
+            return {"machineId": ObjectId(machine_id)}
+        except InvalidId:
+            raise ValueError("machineId tidak valid")
+    # workorders & archive: filter sama dengan GET /api/workorders
+    return queries.build_workorder_query(request.args)
+
+def iter_export_rows(spec, query):
+    """Yield baris dict (kolom sesuai spec), nama mesin/komponen di-resolve per batch."""
+    projection = {c: 1 for c in spec["columns"]}
+    if spec["with_names"]:
+        # Kolom machineName/componentName = "CODE - Name" dari snapshot di WO
+        projection.update(queries.WO_NAME_PROJECTION)
+    cursor = (
+        db[spec["collection"]].find(query, projection)
+        .sort(spec["sort"])
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield from export_batch(spec, batch)
+            batch = []
+    if batch:
+        yield from export_batch(spec, batch)
+
+def export_batch(spec, docs):
+    machine_names, comp_names = get_name_maps(docs) if spec["with_names"] else ({}, {})
+    for doc in docs:
+        if spec["with_names"]:
+            doc["machineName"] = queries.wo_machine_label(doc, machine_names, "Unknown")
+            doc["componentName"] = queries.wo_component_label(doc, comp_names)
+        yield {c: export_value(doc.get(c)) for c in spec["columns"]}
+
+def ndjson_stream(rows):
+    for row in rows:
+        yield serialization.dumps(row) + b"\n"
+
+def csv_stream(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+@app.route('/api/export/<name>', methods=['GET'])
+@token_required
+@role_required('admin', 'supervisor', 'technician')
+def export_collection(current_user, name):
+    spec = EXPORTS.get(name)
+    if not spec:
+        return jsonify({"error": f"Export tersedia: {', '.join(EXPORTS)}"}), 404
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format harus ndjson atau csv"}), 400
+
+    try:
+        query = build_export_query(name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = iter_export_rows(spec, query)
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M')}.{fmt}"
+    if fmt == "csv":
+        body, mimetype = csv_stream(spec["columns"], rows), "text/csv"
+    else:
+        body, mimetype = ndjson_stream(rows), "application/x-ndjson"
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# ==============================================
+# REAL-TIME EVENTS (SSE)
+# ==============================================
+event_broadcaster = events.EventBroadcaster(
+    db,
+    source=os.environ.get("EVENT_SOURCE", "auto"),
+    poll_interval=float(os.environ.get("EVENT_POLL_INTERVAL", 2))
+)
+
+# Tiap koneksi SSE menahan 1 thread gthread selama terbuka → dibatasi per worker supaya
+# dashboard yang terbuka tidak menghabiskan thread untuk API biasa. Lebih dari batas → 503.
+STREAM_MAX_CONNECTIONS = int(os.environ.get(
+    "STREAM_MAX_CONNECTIONS", max(1, int(os.environ.get("GUNICORN_THREADS", 8)) // 4)))
+stream_slots = threading.BoundedSemaphore(STREAM_MAX_CONNECTIONS)
+
+# Token ?token= untuk EventSource: umur pendek & hanya berlaku di /api/stream,
+# jadi URL yang tercatat di log proxy tidak bisa dipakai untuk API lain
+STREAM_TOKEN_TTL = int(os.environ.get("STREAM_TOKEN_TTL", 60))
+
+@app.route('/api/stream/token', methods=['POST'])
+@token_required
+def create_stream_token(current_user):
+    token = jwt.encode({
+        'user_id': str(current_user['_id']),
+        'scope': 'stream',
+        'exp': datetime.utcnow() + timedelta(seconds=STREAM_TOKEN_TTL)
+    }, app.config['SECRET_KEY'], algorithm="HS256")
+    return jsonify({"token": token, "expiresIn": STREAM_TOKEN_TTL}), 200
+
+@app.route('/api/stream', methods=['GET'])
+def stream_events():
+    # EventSource di browser tidak bisa kirim header → token stream (POST /api/stream/token) lewat ?token=
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        current_user, error = user_from_token(auth_header.split(" ")[1])
+    elif request.args.get('token'):
+        current_user, error = user_from_token(request.args['token'], scope="stream")
+    else:
+        return jsonify({"error": "Token tidak ditemukan!"}), 401
+    if error:
+        return jsonify({"error": error}), 401
+
+    if not stream_slots.acquire(blocking=False):
+        response = jsonify({"error": "Terlalu banyak koneksi real-time, coba lagi sebentar."})
+        response.status_code = 503
+        response.headers["Retry-After"] = "10"
+        return response
+
+    subscriber = event_broadcaster.subscribe(current_user.get("role"))
+
+    def generate():
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = subscriber.get(timeout=15)
+            except events.queue.Empty:
+                yield ": ping\n\n"  # heartbeat supaya proxy tidak memutus koneksi
+                continue
+            yield f"event: {event['collection']}\ndata: {json.dumps(event)}\n\n"
+
+    def close():
+        event_broadcaster.unsubscribe(subscriber)
+        stream_slots.release()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    # Dipanggil saat koneksi selesai, termasuk kalau client putus sebelum generator sempat jalan
+    response.call_on_close(close)
+    return response
 
 # ---------- RUN ----------
+_startup_lock = threading.Lock()
+_started = False
+
+def start_app():
+    """
+    Jalankan tugas startup untuk `app` (singleton modul ini) lalu return app.
+    - Development : python app.py
+    - Production  : gunicorn -c gunicorn.conf.py "app:start_app()"
+    Di gunicorn, migrasi dijalankan sekali oleh master (RUN_MIGRATIONS=0 di worker).
+    Dipanggil berkali-kali (test, benchmark) → tugas startup tetap hanya sekali per proses.
+    """
+    global _started
+    with _startup_lock:
+        if _started:
+            return app
+        _started = True
+    if os.environ.get("RUN_MIGRATIONS", "1") == "1":
+        migrations.migrate(db)
+    # AUTO_ARCHIVE_DAYS=30 → WO closed > 30 hari otomatis diarsipkan tiap jam
+    if os.environ.get("AUTO_ARCHIVE_DAYS"):
+        archiver.start_background_archiver(db, days=int(os.environ["AUTO_ARCHIVE_DAYS"]))
+    # SCHEDULER_INTERVAL_SECONDS=300 → jadwal jatuh tempo otomatis dibuatkan WO preventive tiap 5 menit
+    if os.environ.get("SCHEDULER_INTERVAL_SECONDS"):
+        scheduler.start_background_scheduler(db, interval_seconds=int(os.environ["SCHEDULER_INTERVAL_SECONDS"]))
+    return app
+
+create_app = start_app  # nama lama, untuk perintah gunicorn "app:create_app()" yang sudah terpasang
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    start_app().run(debug=True, port=int(os.environ.get("PORT", 5000)))
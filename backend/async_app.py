@@ -0,0 +1,240 @@
+# async_app.py
+# Varian async (Quart + Motor) untuk endpoint BACA yang paling sering dipanggil.
+# Response sama persis dengan app.py; query yang saling bebas dijalankan
+# bersamaan dengan asyncio.gather (mis. nama mesin + komponen di detail WO).
+#
+# Jalankan (production):
+#   uvicorn async_app:app --host 0.0.0.0 --port 5001 --workers 4
+# Endpoint tulis (POST/PUT/DELETE) tetap di app.py.
+import asyncio
+import os
+from datetime import datetime
+from functools import wraps
+
+import jwt
+from bson import ObjectId
+from bson.errors import InvalidId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from quart import Quart, jsonify, request
+from quart_cors import cors
+
+import queries
+import serialization
+from cache import TTLCache
+
+load_dotenv()
+
+app = Quart(__name__)
+app.json = serialization.OrjsonProvider(app)  # sama dengan app.py: ObjectId/datetime langsung di-encode
+app = cors(app, allow_origin="*", expose_headers=["X-Next-Cursor"])
+app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY", 'SECRET_KEY_ANDA')
+
+mongo_client = None
+db = None
+
+# Sama dengan app.py: cache hit = 0 query; perubahan user dari app.py berlaku setelah USER_CACHE_TTL
+user_cache = TTLCache(
+    maxsize=int(os.environ.get("USER_CACHE_SIZE", 1000)),
+    ttl=float(os.environ.get("USER_CACHE_TTL", 30))
+)
+
+
+@app.before_serving
+async def connect_db():
+    # Motor client harus dibuat di event loop yang dipakai server
+    global mongo_client, db
+    mongo_client = AsyncIOMotorClient(
+        os.environ.get("MONGO_URI", "MONGO_URI_ANDA"),
+        maxPoolSize=int(os.environ.get("MONGO_MAX_POOL_SIZE", 50)),
+        minPoolSize=int(os.environ.get("MONGO_MIN_POOL_SIZE", 0)),
+        waitQueueTimeoutMS=int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+    )
+    db = mongo_client.get_default_database("cmms_industri_otomasi")
+
+
+@app.after_serving
+async def close_db():
+    mongo_client.close()
+
+
+# ---------- JWT MIDDLEWARE ----------
+async def user_from_token(token):
+    """Return (user, None) kalau token valid, atau (None, pesan_error). Sama dengan app.py."""
+    try:
+        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+        if data.get('scope'):
+            return None, "Token tidak valid!"  # token khusus (mis. stream) bukan token login
+        user_id = data['user_id']
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await db.users.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+            if not user:
+                return None, "User tidak ditemukan!"
+            user_cache.set(user_id, user)
+    except jwt.ExpiredSignatureError:
+        return None, "Token sudah expired!"
+    except (jwt.InvalidTokenError, KeyError, InvalidId):
+        return None, "Token tidak valid!"
+    return dict(user), None
+
+
+def token_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header:
+            return jsonify({"error": "Token tidak ditemukan!"}), 401
+        try:
+            token = auth_header.split(" ")[1]  # Format: "Bearer TOKEN"
+        except IndexError:
+            return jsonify({"error": "Token format salah!"}), 401
+
+        current_user, error = await user_from_token(token)
+        if error:
+            return jsonify({"error": error}), 401
+        return await f(current_user, *args, **kwargs)
+
+    return decorated
+
+
+def parse_object_id(value):
+    try:
+        return ObjectId(value)
+    except InvalidId:
+        return None
+
+
+# ---------- HELPERS ----------
+async def get_name_maps(workorders):
+    """Versi async get_name_maps: query mesin & komponen jalan bersamaan."""
+    machine_ids, comp_ids = queries.referenced_ids(workorders)
+
+    async def fetch(collection, ids, projection):
+        if not ids:
+            return []
+        return await collection.find({"_id": {"$in": ids}}, projection).to_list(None)
+
+    machines, comps = await asyncio.gather(
+        fetch(db.machines, machine_ids, queries.MACHINE_NAME_PROJECTION),
+        fetch(db.components, comp_ids, queries.COMPONENT_NAME_PROJECTION)
+    )
+    return (
+        {m["_id"]: queries.machine_label(m) for m in machines},
+        {c["_id"]: queries.component_label(c) for c in comps}
+    )
+
+
+async def find_one_or_none(collection, doc_id):
+    if doc_id is None:
+        return None
+    return await collection.find_one({"_id": doc_id})
+
+
+# ==============================================
+# WORK ORDERS
+# ==============================================
+@app.route('/api/workorders', methods=['GET'])
+@token_required
+async def get_workorders(current_user):
+    try:
+        limit = queries.parse_limit(request.args)
+        query = queries.keyset_query(queries.build_workorder_query(request.args), "createdAt", request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    workorders = await (
+        db.workorders.find(query, queries.WO_LIST_PROJECTION)
+        .sort([("createdAt", -1), ("_id", -1)])
+        .limit(limit + 1)
+        .to_list(None)
+    )
+    workorders, next_cursor = queries.split_page(workorders, limit, "createdAt")
+    machine_names, comp_names = await get_name_maps(workorders)
+
+    response = jsonify([queries.workorder_list_item(wo, machine_names, comp_names) for wo in workorders])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+@app.route('/api/workorders/<id>', methods=['GET'])
+@token_required
+async def get_workorder_detail(current_user, id):
+    wo_id = parse_object_id(id)
+    wo = await db.workorders.find_one({"_id": wo_id}) if wo_id else None
+    if not wo:
+        return jsonify({"error": "Work Order tidak ditemukan"}), 404
+
+    # WO lama tanpa snapshot nama → ambil dari machines/components
+    machine, comp = await asyncio.gather(
+        find_one_or_none(db.machines, wo.get("machineId") if "machineCode" not in wo else None),
+        find_one_or_none(db.components, wo.get("componentId") if "componentCode" not in wo else None)
+    )
+    return jsonify(queries.workorder_detail(wo, machine, comp))
+
+
+# ==============================================
+# MACHINES & COMPONENTS
+# ==============================================
+@app.route('/api/machines', methods=['GET'])
+@token_required
+async def get_machines(current_user):
+    machines = await db.machines.find().sort("createdAt", -1).to_list(None)
+    return jsonify([queries.machine_item(m) for m in machines])
+
+
+@app.route('/api/machines/<id>', methods=['GET'])
+@token_required
+async def get_single_machine(current_user, id):
+    machine_id = parse_object_id(id)
+    machine = await db.machines.find_one({"_id": machine_id}) if machine_id else None
+    if not machine:
+        return jsonify({"error": "Mesin tidak ditemukan"}), 404
+    return jsonify(queries.machine_item(machine))
+
+
+@app.route('/api/machines/<machine_id>/components', methods=['GET'])
+@token_required
+async def get_components_by_machine(current_user, machine_id):
+    machine_oid = parse_object_id(machine_id)
+    if not machine_oid:
+        return jsonify({"error": "machineId tidak valid"}), 400
+    components = await db.components.find({"machineId": machine_oid}).sort("componentName", 1).to_list(None)
+    return jsonify([queries.component_item(c) for c in components])
+
+
+@app.route('/api/components', methods=['GET'])
+@token_required
+async def get_components(current_user):
+    return jsonify(await db.components.find().to_list(None))
+
+
+# ==============================================
+# MAINTENANCE SCHEDULES
+# ==============================================
+@app.route('/api/schedules', methods=['GET'])
+@token_required
+async def get_schedules(current_user):
+    schedules = await db.maintenance_schedules.find().to_list(None)
+    today = datetime.now().date()
+    return jsonify([queries.schedule_item(s, today) for s in schedules])
+
+
+@app.route('/api/schedules/<id>', methods=['GET'])
+@token_required
+async def get_single_schedule(current_user, id):
+    schedule_id = parse_object_id(id)
+    schedule = await db.maintenance_schedules.find_one({"_id": schedule_id}) if schedule_id else None
+    if not schedule:
+        return jsonify({"error": "Jadwal tidak ditemukan"}), 404
+    return jsonify(schedule)
+
+
+@app.route('/')
+async def home():
+    return jsonify({"message": "CMMS Async Read API jalan!"})
+
+
+if __name__ == '__main__':
+    app.run(port=int(os.environ.get("PORT", 5001)))
@@ -0,0 +1,91 @@
+# benchmarks/bench_analytics.py
+# Laporan MTTR/MTBF setahun: scan ulang semua WO (pipeline rollup langsung) vs baca wo_rollups.
+# Jalankan dari folder backend terhadap mongod lokal:
+#   MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_analytics.py --workorders 500000 --machines 500
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+
+import analytics
+import migrations
+
+TYPES = ["corrective", "breakdown", "preventive"]
+
+
+def make_data(db, n_workorders, n_machines, now):
+    machine_ids = db.machines.insert_many([
+        {"machineCode": f"BENCH-{i:04d}", "machineName": f"Mesin {i}", "createdAt": now}
+        for i in range(n_machines)
+    ]).inserted_ids
+
+    docs = []
+    for i in range(n_workorders):
+        created = now - timedelta(minutes=random.randint(60, 2 * 365 * 24 * 60))
+        completed = created + timedelta(hours=random.uniform(0.5, 48))
+        # Setengah WO lama sudah di arsip
+        collection = "workorders_archive" if i % 2 else "workorders"
+        docs.append((collection, {
+            "machineId": random.choice(machine_ids), "componentId": None, "type": random.choice(TYPES),
+            "status": "closed", "createdAt": created,
+            "statusTimes": {"open": created, "completed": completed, "closed": completed + timedelta(hours=1)}
+        }))
+        if len(docs) >= 10000:
+            flush(db, docs)
+    flush(db, docs)
+
+
+def flush(db, docs):
+    for name in analytics.WO_COLLECTIONS:
+        batch = [doc for collection, doc in docs if collection == name]
+        if batch:
+            db[name].insert_many(batch)
+    docs.clear()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workorders", type=int, default=500000)
+    parser.add_argument("--machines", type=int, default=500)
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    client.drop_database("cmms_benchmark")
+    db = client.cmms_benchmark
+    migrations.ensure_indexes(db)
+    random.seed(42)
+    now = datetime.now()
+    make_data(db, args.workorders, args.machines, now)
+
+    end = now.strftime("%Y-%m")
+    start = f"{now.year - 1}-{now.month:02d}"
+
+    def full_scan():
+        # Tanpa rollup: aggregate semua WO + arsip setiap kali laporan dibuka
+        return sum(len(list(db[name].aggregate(analytics.rollup_pipeline(now), allowDiskUse=True)))
+                   for name in analytics.WO_COLLECTIONS)
+
+    groups, scan_seconds = timed(full_scan)
+    rollups, rebuild_seconds = timed(lambda: analytics.rebuild_rollups(db))
+    rows, report_seconds = timed(lambda: analytics.reliability_report(db, start, end, "machine"))
+    _, month_seconds = timed(lambda: analytics.reliability_report(db, start, end, "month"))
+
+    print(f"{args.workorders} WO, {args.machines} mesin, laporan {start} s/d {end}")
+    print(f"  scan ulang semua WO      : {scan_seconds * 1000:9.1f} ms ({groups} grup)")
+    print(f"  rebuild wo_rollups (1x)  : {rebuild_seconds * 1000:9.1f} ms ({rollups} dokumen)")
+    print(f"  laporan per mesin        : {report_seconds * 1000:9.1f} ms ({len(rows)} baris)")
+    print(f"  laporan per bulan        : {month_seconds * 1000:9.1f} ms")
+
+    client.drop_database("cmms_benchmark")
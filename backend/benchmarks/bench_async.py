@@ -0,0 +1,56 @@
+# benchmarks/bench_async.py
+# Bandingkan app.py (gunicorn gthread) vs async_app.py (uvicorn + Motor)
+# di endpoint baca yang sama: req/s dan tail latency (p99).
+#
+#   MONGO_URI=mongodb://localhost:27017/cmms_industri_otomasi SECRET_KEY=bench \
+#     python benchmarks/bench_async.py --workers 4 --concurrency 128
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from load_test import BACKEND_DIR, bench_token, run_load, wait_ready
+
+
+def server_command(kind, workers, threads, port):
+    if kind == "sync":
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:start_app()"], {
+            "WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(threads),
+            "BIND": f"127.0.0.1:{port}", "GUNICORN_ACCESS_LOG": "/dev/null", "RUN_MIGRATIONS": "0"
+        }
+    return [sys.executable, "-m", "uvicorn", "async_app:app", "--host", "127.0.0.1",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning"], {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="thread per worker (sync)")
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--duration", type=int, default=15)
+    parser.add_argument("--paths", nargs="+", default=["/api/workorders", "/api/machines", "/api/schedules"])
+    parser.add_argument("--port", type=int, default=5056)
+    args = parser.parse_args()
+
+    token = bench_token(os.environ["MONGO_URI"], os.environ["SECRET_KEY"])
+
+    print(f"{'app':<6} {'path':<22} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'error':>6}")
+    for kind in ["sync", "async"]:
+        cmd, extra_env = server_command(kind, args.workers, args.threads, args.port)
+        server = subprocess.Popen(cmd, cwd=BACKEND_DIR, env={**os.environ, **extra_env},
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready(f"http://127.0.0.1:{args.port}/")
+            for path in args.paths:
+                url = f"http://127.0.0.1:{args.port}{path}"
+                run_load(url, token, args.concurrency, 2)  # pemanasan
+                latencies, errors = run_load(url, token, args.concurrency, args.duration)
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+                p50 = statistics.median(latencies) if latencies else 0
+                print(f"{kind:<6} {path:<22} {len(latencies) / args.duration:>9.1f} "
+                      f"{p50 * 1000:>8.1f} {p99 * 1000:>8.1f} {errors:>6}")
+        finally:
+            server.terminate()
+            server.wait()
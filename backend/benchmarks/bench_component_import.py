@@ -0,0 +1,52 @@
+# benchmarks/bench_component_import.py
+# Bandingkan import komponen: insert_one per baris vs bulk_import (insert_many per chunk).
+# Jalankan dari folder backend terhadap mongod lokal:
+#   MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_component_import.py --rows 5000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+import bulk_import
+
+
+def make_rows(n):
+    return [
+        {"componentCode": f"BENCH-{i:06d}", "componentName": f"Komponen {i}",
+         "status": "good", "lifetimeHours": 20000, "lifetimeCycles": 1000000}
+        for i in range(n)
+    ]
+
+
+def single_insert(collection, rows, machine_id):
+    for row in rows:
+        collection.insert_one(bulk_import.validate_component(row, machine_id))
+
+
+def bulk_insert(collection, rows, machine_id):
+    bulk_import.import_rows(collection, rows, lambda row: bulk_import.validate_component(row, machine_id))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    db = client.cmms_benchmark
+    machine_id = ObjectId()
+    rows = make_rows(args.rows)
+
+    for name, func in [("insert_one per baris", single_insert), ("bulk_import", bulk_insert)]:
+        db.components.drop()
+        start = time.perf_counter()
+        func(db.components, rows, machine_id)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {args.rows} baris: {elapsed:.3f}s ({args.rows / elapsed:,.0f} baris/detik)")
+
+    client.drop_database("cmms_benchmark")
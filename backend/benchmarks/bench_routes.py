@@ -0,0 +1,452 @@
+# benchmarks/bench_routes.py
+# Benchmark semua route app.py: latency (p50/p95) + jumlah command & query MongoDB per request,
+# dibandingkan dengan baseline JSON supaya regresi (query N+1, route melambat) kelihatan.
+#
+# Ada 2 baseline:
+#   - baselines/routes.json        : latency + command, direkam skrip ini di mongod lokal.
+#                                    Belum ada file → exit 1, rekam dulu dengan --save-baseline.
+#   - baselines/route_queries.json : jumlah query per route, direkam tests/test_route_queries.py
+#                                    di mongomock (dataset kecil tetap) → dicek tiap `pytest`, tanpa mongod.
+#
+# Jalankan di database KHUSUS benchmark (route tulis ikut diuji, sweep jadwal mengubah data):
+#   export MONGO_URI=mongodb://localhost:27017/cmms_bench SECRET_KEY=bench
+#   python seed_data.py --machines 500 --components-per-machine 50 --workorders 100000 --schedules 5000 --realistic
+#   python benchmarks/bench_routes.py                   → bandingkan dengan baselines/routes.json
+#   python benchmarks/bench_routes.py --save-baseline   → rekam ulang baseline (setelah perubahan disengaja)
+#   python benchmarks/bench_routes.py --only workorders  → hanya route yang mengandung "workorders"
+#
+# Exit code 1 kalau ada regresi, route gagal, atau route di app.py yang belum ada di benchmark.
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from bson import ObjectId
+from pymongo import monitoring
+from pymongo.collection import Collection
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "routes.json")
+TMP_MARK = "bench-tmp"  # penanda dokumen sementara, dihapus setelah benchmark
+# getMore/killCursors tergantung ukuran hasil, bukan pola query → tidak dihitung
+IGNORED_COMMANDS = {"getMore", "killCursors", "endSessions"}
+# Method Collection yang dihitung sebagai 1 query (panggilan bersarang, mis. find_one → find, dihitung 1)
+QUERY_METHODS = ("find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+                 "insert_one", "insert_many", "update_one", "update_many", "replace_one", "find_one_and_update",
+                 "find_one_and_delete", "delete_one", "delete_many", "bulk_write")
+SKIPPED_ROUTES = {
+    "GET /api/stream": "SSE, koneksi tidak pernah selesai",
+    "GET /static/<path:filename>": "file statis Flask",
+}
+
+
+# ---------- HITUNG COMMAND MONGODB ----------
+class CommandCounter(monitoring.CommandListener):
+    """Jumlah command per thread (test client Flask menjalankan request di thread pemanggil)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, "count", 0)
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self._local.count = self.count + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class QueryCounter:
+    """
+    Jumlah operasi Collection per thread. Tidak butuh command listener, jadi jalan juga
+    di mongomock (tests/test_route_queries.py) dan hasilnya tidak tergantung driver.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, "count", 0)
+
+    def wrap(self, method):
+        local = self._local
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if getattr(local, "active", False):
+                return method(*args, **kwargs)
+            local.count = getattr(local, "count", 0) + 1
+            local.active = True
+            try:
+                return method(*args, **kwargs)
+            finally:
+                local.active = False
+        return wrapper
+
+    def install(self, collection_cls):
+        for name in QUERY_METHODS:
+            setattr(collection_cls, name, self.wrap(getattr(collection_cls, name)))
+
+
+# Harus terdaftar sebelum app.py membuat MongoClient
+counter = CommandCounter()
+monitoring.register(counter)
+queries = QueryCounter()
+queries.install(Collection)
+
+import app as appmod  # noqa: E402
+import passwords  # noqa: E402
+
+db = appmod.db
+
+
+# ---------- FIXTURE ----------
+def bench_user():
+    """Admin khusus benchmark (password bench123) + JWT-nya."""
+    db.users.update_one(
+        {"username": "bench-admin"},
+        {"$setOnInsert": {"username": "bench-admin", "role": "admin",
+                          "password": passwords.hash_password("bench123"), "created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    user = db.users.find_one({"username": "bench-admin"}, {"_id": 1})
+    token = jwt.encode({"user_id": str(user["_id"]), "exp": datetime.utcnow() + timedelta(hours=2)},
+                       appmod.app.config["SECRET_KEY"], algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def sample_ids():
+    def one(collection, query=None):
+        doc = db[collection].find_one(query or {}, {"_id": 1})
+        if not doc:
+            raise SystemExit(f"Collection {collection} kosong, jalankan seed_data.py dulu")
+        return doc["_id"]
+
+    return {
+        "machine": one("machines"),
+        "workorder": one("workorders"),
+        "schedule": one("maintenance_schedules"),
+    }
+
+
+def tmp_machine():
+    code = f"BENCHTMP-{ObjectId()}"
+    return db.machines.insert_one({"machineCode": code, "machineName": TMP_MARK, "machineType": "-",
+                                   "location": "-", "status": "active", "createdAt": datetime.utcnow()}).inserted_id
+
+
+def tmp_component(ids):
+    return db.components.insert_one({"machineId": ids["machine"], "componentCode": "BENCHTMP", "componentName": TMP_MARK,
+                                     "status": "good", "createdAt": datetime.utcnow()}).inserted_id
+
+
+def tmp_workorder(ids, status="open", collection="workorders"):
+    now = datetime.now()
+    doc = {"woNumber": f"BENCHTMP-{ObjectId()}", "machineId": ids["machine"], "componentId": None, "type": "corrective",
+           "priority": "low", "description": TMP_MARK, "status": status, "assignedTo": None, "createdAt": now,
+           "updatedAt": now, "history": [{"status": status, "timestamp": now, "by": "bench"}],
+           "statusTimes": {status: now}}
+    if status == "closed":
+        doc["closedAt"] = now
+    if collection == "workorders_archive":
+        doc["archivedAt"] = now
+    return db[collection].insert_one(doc).inserted_id
+
+
+def tmp_schedule(ids):
+    now = datetime.now()
+    return db.maintenance_schedules.insert_one({"machineId": ids["machine"], "machineName": TMP_MARK, "task": TMP_MARK,
+                                                "frequency_days": 30, "last_done": now,
+                                                "next_due": now + timedelta(days=30)}).inserted_id
+
+
+def tmp_user():
+    return db.users.insert_one({"username": f"{TMP_MARK}-{ObjectId()}", "role": "operator", "password": "-",
+                                "created_at": datetime.utcnow()}).inserted_id
+
+
+def cleanup():
+    wo_ids = [wo["_id"] for name in ("workorders", "workorders_archive")
+              for wo in db[name].find({"description": TMP_MARK}, {"_id": 1})]
+    db.workorders.delete_many({"description": TMP_MARK})
+    db.workorders_archive.delete_many({"description": TMP_MARK})
+    db.workorder_events.delete_many({"woId": {"$in": wo_ids}})
+    db.machines.delete_many({"machineCode": {"$regex": "^BENCHTMP"}})
+    db.components.delete_many({"componentCode": {"$regex": "^BENCHTMP"}})
+    db.maintenance_schedules.delete_many({"task": TMP_MARK})
+    db.users.delete_many({"username": {"$regex": f"^{TMP_MARK}"}})
+
+
+# ---------- DAFTAR ROUTE ----------
+class Case:
+    """
+    1 skenario benchmark. `path`/`body` boleh fungsi(ids, tmp) → nilai; `setup(ids)` dipanggil
+    sebelum tiap request (di luar pengukuran) dan hasilnya jadi `tmp`.
+    """
+
+    def __init__(self, method, rule, path=None, body=None, setup=None, iterations=None):
+        self.method = method
+        self.rule = rule
+        self.path = path or rule
+        self.body = body
+        self.setup = setup
+        self.iterations = iterations
+
+    @property
+    def name(self):
+        return f"{self.method} {self.rule}"
+
+
+def value(v, ids, tmp):
+    return v(ids, tmp) if callable(v) else v
+
+
+def machine_rows(n):
+    return lambda ids, tmp: [
+        {"machineCode": f"BENCHTMP-{ObjectId()}", "machineName": TMP_MARK, "machineType": "-",
+         "location": "-", "installDate": "2025-01-01"}
+        for _ in range(n)
+    ]
+
+
+def component_rows(n):
+    return lambda ids, tmp: [{"componentCode": f"BENCHTMP-{i}", "componentName": TMP_MARK} for i in range(n)]
+
+
+def schedule_body(ids, tmp):
+    return {"machineId": str(ids["machine"]), "machineName": TMP_MARK, "task": TMP_MARK,
+            "frequency_days": 30, "last_done": datetime.now().isoformat()}
+
+
+def build_cases(ids):
+    month = datetime.now().strftime("%Y-%m")
+    return [
+        Case("GET", "/"),
+        Case("POST", "/api/login", body={"username": "bench-admin", "password": "bench123"}),
+        Case("POST", "/api/register", body=lambda ids, tmp: {"username": f"{TMP_MARK}-{ObjectId()}", "password": "bench123"}),
+        Case("GET", "/api/me"),
+        Case("GET", "/metrics"),
+        Case("GET", "/api/cache/stats"),
+        Case("POST", "/api/stream/token"),
+        # Users
+        Case("GET", "/api/users"),
+        Case("PUT", "/api/users/<user_id>", lambda ids, tmp: f"/api/users/{tmp}", body={"role": "technician"}, setup=lambda ids: tmp_user()),
+        Case("DELETE", "/api/users/<user_id>", lambda ids, tmp: f"/api/users/{tmp}", setup=lambda ids: tmp_user()),
+        # Mesin & komponen
+        Case("GET", "/api/machines"),
+        Case("POST", "/api/machines", body=lambda ids, tmp: machine_rows(1)(ids, tmp)[0]),
+        Case("POST", "/api/machines/bulk", body=machine_rows(100)),
+        Case("GET", "/api/machines/<id>", lambda ids, tmp: f"/api/machines/{ids['machine']}"),
+        Case("PUT", "/api/machines/<id>", lambda ids, tmp: f"/api/machines/{tmp}",
+             body={"location": "Bench"}, setup=lambda ids: tmp_machine()),
+        Case("DELETE", "/api/machines/<id>", lambda ids, tmp: f"/api/machines/{tmp}", setup=lambda ids: tmp_machine()),
+        Case("GET", "/api/machines/component-stats"),
+        Case("GET", "/api/machines/<machine_id>/components", lambda ids, tmp: f"/api/machines/{ids['machine']}/components"),
+        Case("POST", "/api/machines/<machine_id>/components", lambda ids, tmp: f"/api/machines/{ids['machine']}/components",
+             body={"componentCode": "BENCHTMP", "componentName": TMP_MARK}),
+        Case("POST", "/api/machines/<machine_id>/components/bulk",
+             lambda ids, tmp: f"/api/machines/{ids['machine']}/components/bulk", body=component_rows(100)),
+        Case("GET", "/api/components", iterations=5),
+        Case("POST", "/api/components/bulk", body=lambda ids, tmp: [
+            {**row, "machineCode": db.machines.find_one({"_id": ids["machine"]})["machineCode"]}
+            for row in component_rows(100)(ids, tmp)
+        ]),
+        Case("POST", "/api/components/usage", body=lambda ids, tmp: [
+            {"componentId": str(c["_id"]), "hours": 1} for c in db.components.find({}, {"_id": 1}).limit(500)
+        ]),
+        Case("POST", "/api/components/wear/recompute", iterations=3),
+        Case("PUT", "/api/components/<comp_id>", lambda ids, tmp: f"/api/components/{tmp}",
+             body={"notes": "bench"}, setup=tmp_component),
+        Case("DELETE", "/api/components/<comp_id>", lambda ids, tmp: f"/api/components/{tmp}", setup=tmp_component),
+        # Work order
+        Case("GET", "/api/workorders", "/api/workorders?limit=50"),
+        Case("POST", "/api/workorders", body=lambda ids, tmp: {
+            "machineId": str(ids["machine"]), "type": "corrective", "priority": "low", "description": TMP_MARK}),
+        Case("GET", "/api/workorders/<id>", lambda ids, tmp: f"/api/workorders/{ids['workorder']}"),
+        Case("GET", "/api/workorders/<id>/history", lambda ids, tmp: f"/api/workorders/{ids['workorder']}/history"),
+        Case("PUT", "/api/workorders/<id>/status", lambda ids, tmp: f"/api/workorders/{tmp}/status",
+             body={"status": "in_progress"}, setup=lambda ids: tmp_workorder(ids)),
+        Case("POST", "/api/workorders/<id>/claim", lambda ids, tmp: f"/api/workorders/{tmp}/claim",
+             setup=lambda ids: tmp_workorder(ids)),
+        Case("DELETE", "/api/workorders/<id>", lambda ids, tmp: f"/api/workorders/{tmp}",
+             setup=lambda ids: tmp_workorder(ids)),
+        Case("POST", "/api/workorders/<id>/archive", lambda ids, tmp: f"/api/workorders/{tmp}/archive",
+             setup=lambda ids: tmp_workorder(ids, "closed")),
+        Case("GET", "/api/workorders/archive", "/api/workorders/archive?limit=50"),
+        Case("POST", "/api/workorders/archive/<id>/restore", lambda ids, tmp: f"/api/workorders/archive/{tmp}/restore",
+             setup=lambda ids: tmp_workorder(ids, "closed", "workorders_archive")),
+        Case("POST", "/api/workorders/archive/bulk", body=lambda ids, tmp: {"ids": [str(i) for i in tmp]},
+             setup=lambda ids: [tmp_workorder(ids, "closed") for _ in range(50)]),
+        Case("POST", "/api/workorders/archive/bulk-restore", body=lambda ids, tmp: {"ids": [str(i) for i in tmp]},
+             setup=lambda ids: [tmp_workorder(ids, "closed", "workorders_archive") for _ in range(50)]),
+        Case("GET", "/api/export/<name>", "/api/export/workorders?format=ndjson", iterations=3),
+        # Dashboard & analitik
+        Case("GET", "/api/dashboard/summary"),
+        Case("GET", "/api/dashboard/alerts"),
+        Case("GET", "/api/analytics/reliability", f"/api/analytics/reliability?groupBy=machine&to={month}"),
+        Case("POST", "/api/analytics/rebuild", iterations=3),
+        # Jadwal
+        Case("GET", "/api/schedules"),
+        Case("POST", "/api/schedules", body=schedule_body),
+        Case("GET", "/api/schedules/<id>", lambda ids, tmp: f"/api/schedules/{ids['schedule']}"),
+        Case("PUT", "/api/schedules/<id>", lambda ids, tmp: f"/api/schedules/{tmp}", body=schedule_body,
+             setup=tmp_schedule),
+        Case("DELETE", "/api/schedules/<id>", lambda ids, tmp: f"/api/schedules/{tmp}", setup=tmp_schedule),
+        Case("POST", "/api/schedules/sweep", iterations=3),
+        Case("GET", "/api/maintenance-stats"),
+        Case("GET", "/api/maintenance-history"),
+    ]
+
+
+# ---------- JALANKAN ----------
+def run_case(client, headers, case, ids, iterations, warmup):
+    latencies, commands, query_counts, statuses = [], [], [], set()
+    for i in range(warmup + iterations):
+        tmp = case.setup(ids) if case.setup else None
+        body = value(case.body, ids, tmp)
+        kwargs = {"headers": headers}
+        if body is not None:
+            kwargs["json"] = body
+
+        counter.reset()
+        queries.reset()
+        start = time.perf_counter()
+        response = client.open(value(case.path, ids, tmp), method=case.method, **kwargs)
+        response.get_data()  # response streaming (export) dihitung sampai selesai
+        seconds = time.perf_counter() - start
+        response.close()
+
+        statuses.add(response.status_code)
+        if i >= warmup:
+            latencies.append(seconds * 1000)
+            commands.append(counter.count)
+            query_counts.append(queries.count)
+
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 2),
+        "commands": int(statistics.median(commands)),
+        "queries": max(query_counts),
+        "status": sorted(statuses),
+    }
+
+
+def uncovered_routes(cases):
+    covered = {case.name for case in cases} | set(SKIPPED_ROUTES)
+    return sorted(
+        f"{method} {rule.rule}"
+        for rule in appmod.app.url_map.iter_rules()
+        for method in rule.methods - {"HEAD", "OPTIONS"}
+        if f"{method} {rule.rule}" not in covered
+    )
+
+
+def compare(results, baseline, tolerance):
+    """Return daftar (route, alasan) yang lebih buruk dari baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            regressions.append((name, "belum ada di baseline"))
+            continue
+        if base.get("commands") is None or base.get("p50_ms") is None:
+            regressions.append((name, "baseline belum punya angka, rekam dengan --save-baseline"))
+            continue
+        if result["commands"] > base["commands"]:
+            regressions.append((name, f"command MongoDB {base['commands']} → {result['commands']}"))
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append((name, f"p50 {base['p50_ms']} ms → {result['p50_ms']} ms"))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20, help="request terukur per route")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", help="hanya route yang mengandung teks ini")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="toleransi kenaikan p50 (0.5 = +50%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    headers = bench_user()
+    ids = sample_ids()
+    cases = build_cases(ids)
+    missing = uncovered_routes(cases)
+    if args.only:
+        cases = [c for c in cases if args.only in c.rule]
+
+    client = appmod.app.test_client()
+    results = {}
+    failed = []
+    print(f"{'route':<55} {'p50 ms':>9} {'p95 ms':>9} {'cmd':>5} {'query':>5}  status")
+    try:
+        for case in cases:
+            result = run_case(client, headers, case, ids, case.iterations or args.iterations, args.warmup)
+            results[case.name] = result
+            if any(s >= 400 for s in result["status"]):
+                failed.append(case.name)
+            print(f"{case.name:<55} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['commands']:>5} {result['queries']:>5}  "
+                  f"{','.join(map(str, result['status']))}")
+    finally:
+        cleanup()
+        appmod.password_pool.shutdown()
+
+    for name in missing:
+        print(f"ROUTE BELUM DI-BENCHMARK: {name}")
+    for name in failed:
+        print(f"ROUTE GAGAL (status >= 400): {name}")
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+        routes = saved.get("routes", {})
+        routes.update({name: {k: r[k] for k in ("p50_ms", "p95_ms", "commands")} for name, r in results.items()})
+        saved = {
+            "meta": {
+                "recordedAt": datetime.utcnow().isoformat() + "Z",
+                "iterations": args.iterations,
+                "dataset": {name: db[name].estimated_document_count()
+                            for name in ("machines", "components", "workorders", "workorders_archive",
+                                         "workorder_events", "maintenance_schedules")},
+            },
+            "routes": dict(sorted(routes.items())),
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2)
+            f.write("\n")
+        print(f"Baseline disimpan ke {args.baseline}")
+        sys.exit(1 if failed or missing else 0)
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline {args.baseline} belum ada, rekam dulu dengan --save-baseline")
+        sys.exit(1)
+    with open(args.baseline) as f:
+        baseline = json.load(f).get("routes", {})
+    regressions = compare(results, baseline, args.tolerance)
+    for name, reason in regressions:
+        print(f"REGRESI {name}: {reason}")
+    sys.exit(1 if regressions or failed or missing else 0)
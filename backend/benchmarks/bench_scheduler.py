@@ -0,0 +1,72 @@
+# benchmarks/bench_scheduler.py
+# Ukur sweep scheduler (jadwal jatuh tempo → WO preventive) di data sintetis.
+# Jalankan dari folder backend terhadap mongod lokal:
+#   MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_scheduler.py --schedules 50000 --machines 500
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+
+import migrations
+import scheduler
+
+
+def make_data(db, n_schedules, n_machines, due_ratio, now):
+    machine_ids = db.machines.insert_many([
+        {"machineCode": f"BENCH-{i:04d}", "machineName": f"Mesin {i}", "createdAt": now}
+        for i in range(n_machines)
+    ]).inserted_ids
+
+    docs = []
+    for i in range(n_schedules):
+        frequency = random.choice([7, 14, 30, 90])
+        # `due_ratio` jadwal sudah jatuh tempo (0 - 3 periode lalu), sisanya masih di depan
+        if random.random() < due_ratio:
+            next_due = now - timedelta(days=random.uniform(0, 3 * frequency))
+        else:
+            next_due = now + timedelta(days=random.uniform(1, frequency))
+        docs.append({
+            "machineId": random.choice(machine_ids), "machineName": "-", "task": f"Task {i}",
+            "frequency_days": frequency, "last_done": next_due - timedelta(days=frequency), "next_due": next_due
+        })
+        if len(docs) >= 10000:
+            db.maintenance_schedules.insert_many(docs)
+            docs = []
+    if docs:
+        db.maintenance_schedules.insert_many(docs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schedules", type=int, default=50000)
+    parser.add_argument("--machines", type=int, default=500)
+    parser.add_argument("--due-ratio", type=float, default=0.6, help="porsi jadwal yang jatuh tempo")
+    parser.add_argument("--batch", nargs="+", type=int, default=[500, 1000, 5000])
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    now = datetime.now()
+
+    for batch_size in args.batch:
+        client.drop_database("cmms_benchmark")
+        db = client.cmms_benchmark
+        migrations.ensure_indexes(db)
+        random.seed(42)
+        make_data(db, args.schedules, args.machines, args.due_ratio, now)
+
+        start = time.perf_counter()
+        result = scheduler.sweep_due_schedules(db, now=now, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        # Sweep kedua harus kosong (idempotent)
+        again = scheduler.sweep_due_schedules(db, now=now, batch_size=batch_size)
+
+        print(f"batch {batch_size:>5}: {result['due']} jadwal jatuh tempo, {result['created']} WO, "
+              f"{elapsed:.2f}s ({result['due'] / elapsed:,.0f} jadwal/detik) | sweep ulang: {again['created']} WO")
+
+    client.drop_database("cmms_benchmark")
@@ -0,0 +1,98 @@
+# benchmarks/bench_serialization.py
+# Bandingkan encode payload list WO: cara lama (loop str()/isoformat per field +
+# provider JSON bawaan Flask) vs Schema + OrjsonProvider (serialization.py).
+# Tidak butuh MongoDB, data sintetis di memori:
+#   python benchmarks/bench_serialization.py --rows 10000 --repeat 5
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import queries
+import serialization
+
+STATUSES = ["open", "in_progress", "pending", "completed"]
+
+
+def make_rows(n):
+    machine_ids = [ObjectId() for _ in range(200)]
+    now = datetime.utcnow()
+    rows = []
+    for i in range(n):
+        created = now - timedelta(minutes=random.randint(0, 500000))
+        status = random.choice(STATUSES)
+        times = {"open": created}
+        for j, s in enumerate(STATUSES[1:STATUSES.index(status) + 1], start=1):
+            times[s] = created + timedelta(hours=j)
+        rows.append({
+            "_id": ObjectId(), "woNumber": f"WO-2024-01-{i:05d}", "machineId": random.choice(machine_ids),
+            "componentId": ObjectId(), "machineCode": f"M-{i % 200:03d}", "machineName": f"Mesin {i % 200}",
+            "componentName": "Bearing", "type": random.choice(["corrective", "preventive"]),
+            "priority": random.choice(["low", "medium", "high"]), "status": status,
+            "description": "Ganti bearing " * 3, "assignedTo": "teknisi1",
+            "createdAt": created, "updatedAt": created, "statusTimes": times
+        })
+    return rows
+
+
+def legacy_item(wo):
+    # queries.workorder_list_item sebelum serialization.py: konversi manual per field
+    return {
+        "_id": str(wo["_id"]),
+        "woNumber": wo.get("woNumber", "-"),
+        "type": wo.get("type", "-"),
+        "priority": wo.get("priority", "low"),
+        "status": wo.get("status", "open"),
+        "description": wo.get("description", ""),
+        "createdAt": wo["createdAt"].isoformat() if wo.get("createdAt") else None,
+        "machineId": str(wo["machineId"]),
+        "machineName": queries.wo_machine_label(wo, {}),
+        "componentName": queries.wo_component_label(wo, {}),
+        "statusTimes": {s: ts.isoformat() for s, ts in (wo.get("statusTimes") or {}).items()}
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    app = Flask(__name__)
+    legacy = DefaultJSONProvider(app)
+    fast = serialization.OrjsonProvider(app)
+    names = {}
+
+    def run_legacy():
+        return legacy.dumps([legacy_item(wo) for wo in rows])
+
+    def run_fast():
+        return serialization.dumps([queries.workorder_list_item(wo, names, names) for wo in rows])
+
+    with app.app_context():
+        results = [("lama (str/isoformat + json)", *timed(run_legacy, args.repeat)),
+                   ("schema + orjson", *timed(run_fast, args.repeat))]
+
+    print(f"{args.rows} baris WO, terbaik dari {args.repeat}x")
+    for label, seconds, size in results:
+        print(f"  {label:<30} {seconds * 1000:8.1f} ms  {size / 1024:8.0f} KB")
+    print(f"  speedup: {results[0][1] / results[1][1]:.1f}x")
@@ -0,0 +1,103 @@
+# benchmarks/load_test.py
+# Load test: jalankan gunicorn dengan jumlah worker berbeda, ukur throughput tiap konfigurasi.
+#
+# Butuh mongod lokal berisi data (lihat seed_data.py) dan gunicorn terpasang:
+#   MONGO_URI=mongodb://localhost:27017/cmms_industri_otomasi SECRET_KEY=bench \
+#     python benchmarks/load_test.py --workers 1 2 4 8 --path /api/workorders
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import jwt
+from pymongo import MongoClient, ReturnDocument
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_token(uri, secret):
+    """Pastikan user admin khusus benchmark ada, lalu buat JWT-nya."""
+    db = MongoClient(uri).get_default_database("cmms_industri_otomasi")
+    user = db.users.find_one_and_update(
+        {"username": "bench-admin"},
+        {"$setOnInsert": {"username": "bench-admin", "role": "admin", "password": "-", "created_at": datetime.utcnow()}},
+        upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return jwt.encode({"user_id": str(user["_id"]), "exp": datetime.utcnow() + timedelta(hours=1)}, secret, algorithm="HS256")
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except Exception:
+            time.sleep(0.3)
+    raise RuntimeError("server tidak mau start")
+
+
+def run_load(url, token, concurrency, duration):
+    latencies = []
+    errors = 0
+    stop_at = time.time() + duration
+
+    def worker():
+        nonlocal errors
+        local = []
+        req = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+        while time.time() < stop_at:
+            start = time.perf_counter()
+            try:
+                urllib.request.urlopen(req, timeout=10).read()
+                local.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+        return local
+
+    with ThreadPoolExecutor(concurrency) as ex:
+        for result in ex.map(lambda _: worker(), range(concurrency)):
+            latencies.extend(result)
+    return latencies, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=64, help="jumlah client paralel")
+    parser.add_argument("--duration", type=int, default=15, help="detik per konfigurasi")
+    parser.add_argument("--path", default="/api/workorders")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    uri = os.environ["MONGO_URI"]
+    secret = os.environ["SECRET_KEY"]
+    token = bench_token(uri, secret)
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'error':>6}")
+    for workers in args.workers:
+        env = {**os.environ, "WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(args.threads),
+               "BIND": f"127.0.0.1:{args.port}", "GUNICORN_ACCESS_LOG": "/dev/null"}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:start_app()"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_ready(f"http://127.0.0.1:{args.port}/")
+            run_load(url, token, args.concurrency, 2)  # pemanasan
+            latencies, errors = run_load(url, token, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+        print(f"{workers:>7} {len(latencies) / args.duration:>9.1f} "
+              f"{statistics.median(latencies) * 1000 if latencies else 0:>8.1f} {p99 * 1000:>8.1f} {errors:>6}")
@@ -0,0 +1,134 @@
+# bulk_import.py
+# Import banyak mesin / komponen sekaligus (JSON array atau CSV).
+#
+# Baris divalidasi satu per satu sambil dibaca (CSV tidak dimuat penuh ke memori),
+# baris valid ditulis per chunk dengan insert_many(ordered=False).
+# Hasil: jumlah yang masuk + daftar error per baris (nomor baris mulai 1).
+import csv
+import io
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+CHUNK_SIZE = 1000
+COMPONENT_STATUS = ["good", "warning", "critical"]
+
+
+def read_rows(req):
+    """
+    Ambil iterator baris dari request:
+    - multipart dengan file `file` (CSV)
+    - body text/csv
+    - body JSON array of objects
+    """
+    if "file" in req.files:
+        stream = io.TextIOWrapper(req.files["file"].stream, encoding="utf-8-sig", newline="")
+        return csv.DictReader(stream)
+    if req.mimetype == "text/csv":
+        # Dibaca bertahap dari socket, body tidak pernah dimuat utuh ke memori
+        return csv.DictReader(io.TextIOWrapper(req.stream, encoding="utf-8-sig", newline=""))
+    data = req.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Body harus JSON array atau file CSV")
+    return iter(data)
+
+
+def _text(row, field):
+    """Nilai teks (di-strip). Angka dari JSON ("machineCode": 123) jadi string, object/array ditolak."""
+    value = row.get(field)
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"{field} harus teks")
+    return str(value).strip()
+
+
+def _int(row, field):
+    value = row.get(field)
+    if value in (None, ""):
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} harus angka")
+
+
+def validate_component(row, machine_id):
+    """Ubah 1 baris jadi dokumen komponen (format sama dengan create_component)."""
+    if not isinstance(row, dict):
+        raise ValueError("Baris harus object")
+    for field in ["componentCode", "componentName"]:
+        if not _text(row, field):
+            raise ValueError(f"Field {field} wajib diisi!")
+    status = _text(row, "status") or "good"
+    if status not in COMPONENT_STATUS:
+        raise ValueError(f"status harus salah satu dari: {', '.join(COMPONENT_STATUS)}")
+
+    return {
+        "machineId": machine_id,
+        "componentCode": _text(row, "componentCode").upper(),
+        "componentName": _text(row, "componentName"),
+        "installDate": _text(row, "installDate") or datetime.utcnow().isoformat() + "Z",
+        "status": status,
+        "lifetimeHours": _int(row, "lifetimeHours"),
+        "lifetimeCycles": _int(row, "lifetimeCycles"),
+        "notes": _text(row, "notes") or "",
+        "createdAt": datetime.utcnow()
+    }
+
+
+def validate_machine(row):
+    """Ubah 1 baris jadi dokumen mesin (format sama dengan create_machine)."""
+    if not isinstance(row, dict):
+        raise ValueError("Baris harus object")
+    for field in ["machineCode", "machineName", "machineType", "location", "installDate"]:
+        if not _text(row, field):
+            raise ValueError(f"Field {field} wajib diisi!")
+
+    return {
+        "machineCode": _text(row, "machineCode").upper(),
+        "machineName": _text(row, "machineName"),
+        "machineType": _text(row, "machineType"),
+        "location": _text(row, "location"),
+        "installDate": _text(row, "installDate"),
+        "status": _text(row, "status") or "active",
+        "createdAt": datetime.utcnow()
+    }
+
+
+def import_rows(collection, rows, validate, chunk_size=CHUNK_SIZE):
+    """
+    Validasi + insert `rows` ke `collection`.
+    `validate(row)` return dokumen atau raise ValueError.
+    Return {"inserted": n, "errors": [{"row": no, "error": pesan}]}.
+    """
+    inserted = 0
+    errors = []
+    chunk = []  # (nomor_baris, dokumen)
+
+    def flush():
+        nonlocal inserted
+        if not chunk:
+            return
+        try:
+            result = collection.insert_many([doc for _, doc in chunk], ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            details = e.details
+            inserted += details.get("nInserted", 0)
+            for err in details.get("writeErrors", []):
+                errors.append({"row": chunk[err["index"]][0], "error": err.get("errmsg", "Gagal insert")})
+        chunk.clear()
+
+    for number, row in enumerate(rows, start=1):
+        try:
+            chunk.append((number, validate(row)))
+        except ValueError as e:
+            errors.append({"row": number, "error": str(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    errors.sort(key=lambda e: e["row"])
+    return {"inserted": inserted, "errors": errors}
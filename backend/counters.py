@@ -0,0 +1,78 @@
+# counters.py
+# Generator nomor WO atomik (WO-YYYY-MM-NNNN) pakai collection `counters`.
+#
+# Satu dokumen counter per bulan: {"_id": "wo-2025-01", "seq": 42}
+# Nomor diambil dengan find_one_and_update + $inc → tidak ada regex scan
+# dan tidak ada nomor dobel walaupun banyak teknisi buat WO bersamaan.
+import re
+import threading
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+WO_NUMBER_PATTERN = re.compile(r"^WO-(\d{4}-\d{2})-(\d+)$")
+
+
+def counter_key(month):
+    return f"wo-{month}"
+
+
+def format_wo_number(month, seq):
+    return f"WO-{month}-{str(seq).zfill(4)}"
+
+
+def reserve_block(db, month, size=1):
+    """
+    Naikkan counter bulan `month` sebanyak `size` secara atomik.
+    Return (nomor_pertama, nomor_terakhir) yang sekarang jadi milik pemanggil.
+    """
+    doc = db.counters.find_one_and_update(
+        {"_id": counter_key(month)},
+        {"$inc": {"seq": size}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["seq"] - size + 1, doc["seq"]
+
+
+class WoNumberAllocator:
+    """
+    Pembagi nomor WO per proses.
+
+    block_size=1  → tiap nomor 1x round trip, urut tanpa celah.
+    block_size=N  → ambil N nomor sekaligus, dibagi lokal tanpa ke DB.
+                    Sisa blok hilang kalau proses restart (nomor bisa loncat).
+    """
+
+    def __init__(self, db, block_size=1):
+        self.db = db
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+        self._month = None
+        self._next = 0
+        self._last = -1
+
+    def next_number(self, now=None):
+        month = (now or datetime.now()).strftime('%Y-%m')
+        with self._lock:
+            if month != self._month or self._next > self._last:
+                self._next, self._last = reserve_block(self.db, month, self.block_size)
+                self._month = month
+            seq = self._next
+            self._next += 1
+        return format_wo_number(month, seq)
+
+
+def seed_counters_from_workorders(db):
+    """Set counter tiap bulan ke nomor WO tertinggi yang sudah ada (aktif + arsip)."""
+    highest = {}
+    for collection in (db.workorders, db.workorders_archive):
+        for wo in collection.find({"woNumber": {"$regex": "^WO-"}}, {"woNumber": 1}):
+            match = WO_NUMBER_PATTERN.match(wo["woNumber"])
+            if match:
+                month, seq = match.group(1), int(match.group(2))
+                highest[month] = max(highest.get(month, 0), seq)
+
+    for month, seq in highest.items():
+        db.counters.update_one({"_id": counter_key(month)}, {"$max": {"seq": seq}}, upsert=True)
+    return highest
@@ -0,0 +1,135 @@
+# events.py
+# Event real-time WO & jadwal untuk endpoint SSE (/api/stream).
+#
+# Satu thread per proses membaca perubahan dari MongoDB lalu membagikan ke
+# semua subscriber (tiap koneksi SSE punya queue sendiri):
+#   - replica set  → change stream (db.watch)
+#   - mongod standalone (dev/test) → polling field `updatedAt` tiap beberapa detik
+#     (delete tidak terdeteksi di mode polling)
+# EVENT_SOURCE=polling memaksa mode polling walaupun replica set.
+import queue
+import threading
+import time
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+WATCHED_COLLECTIONS = ["workorders", "maintenance_schedules"]
+
+# Collection yang boleh dilihat tiap role
+ROLE_COLLECTIONS = {
+    "admin": {"workorders", "maintenance_schedules"},
+    "supervisor": {"workorders", "maintenance_schedules"},
+    "technician": {"workorders", "maintenance_schedules"},
+    "operator": {"workorders"},
+}
+
+# Field ringkas yang dikirim (bukan seluruh dokumen / history)
+EVENT_FIELDS = {
+    "workorders": ["woNumber", "status", "priority", "type", "machineId", "componentId", "assignedName"],
+    "maintenance_schedules": ["machineId", "machineName", "task", "next_due", "last_done"],
+}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is not None and not isinstance(value, (str, int, float, bool)):
+        return str(value)
+    return value
+
+
+def make_event(collection, operation, doc_id, doc=None):
+    fields = {f: _plain(doc.get(f)) for f in EVENT_FIELDS[collection] if doc and f in doc}
+    return {
+        "collection": collection,
+        "operation": operation,  # insert / update / replace / delete
+        "_id": str(doc_id),
+        **fields,
+    }
+
+
+class EventBroadcaster:
+    def __init__(self, db, source="auto", poll_interval=2.0, queue_size=1000):
+        self.db = db
+        self.source = source  # "auto" (change stream, fallback polling) / "polling"
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.mode = None  # "change_stream" / "polling"
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---------- subscriber ----------
+    def subscribe(self, role):
+        q = queue.Queue(maxsize=self.queue_size)
+        q.collections = ROLE_COLLECTIONS.get(role, set())
+        with self._lock:
+            self._subscribers.add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-broadcaster", daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            if event["collection"] not in q.collections:
+                continue
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                pass  # client terlalu lambat → event dilewati, client bisa refresh penuh
+
+    # ---------- sumber event ----------
+    def _run(self):
+        if self.source == "polling":
+            self._poll()
+            return
+        try:
+            self._watch_change_stream()
+        except OperationFailure:
+            # Change stream hanya ada di replica set
+            self._poll()
+
+    def _watch_change_stream(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}}]
+        resume_token = None
+        while True:
+            try:
+                with self.db.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    self.mode = "change_stream"
+                    for change in stream:
+                        resume_token = stream.resume_token
+                        self.publish(make_event(
+                            change["ns"]["coll"],
+                            change["operationType"],
+                            change["documentKey"]["_id"],
+                            change.get("fullDocument"),
+                        ))
+            except OperationFailure:
+                if self.mode is None:
+                    raise
+                time.sleep(1)
+            except PyMongoError:
+                time.sleep(1)  # koneksi putus → sambung ulang dari resume_token
+
+    def _poll(self):
+        self.mode = "polling"
+        last_seen = {name: datetime.utcnow() for name in WATCHED_COLLECTIONS}
+        while True:
+            time.sleep(self.poll_interval)
+            for name in WATCHED_COLLECTIONS:
+                try:
+                    docs = list(self.db[name].find({"updatedAt": {"$gt": last_seen[name]}}).sort("updatedAt", 1).limit(500))
+                except PyMongoError:
+                    continue
+                for doc in docs:
+                    # Polling tidak bisa membedakan insert/update → selalu "update"
+                    self.publish(make_event(name, "update", doc["_id"], doc))
+                    last_seen[name] = doc["updatedAt"]
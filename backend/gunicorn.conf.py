@@ -0,0 +1,62 @@
+# gunicorn.conf.py
+# Mode production:
+#   gunicorn -c gunicorn.conf.py "app:start_app()"
+#
+# Semua angka bisa diatur lewat environment (lihat .env.example).
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+
+# Worker = proses (pakai semua core), thread = request paralel per worker.
+# gthread dipakai karena handler blocking di PyMongo dan /api/stream (SSE) menahan 1 thread per koneksi
+# (dibatasi STREAM_MAX_CONNECTIONS per worker, default threads // 4, sisanya 503).
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_class = "gthread"
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Ganti worker berkala supaya memori tidak terus naik
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = 500
+
+# MongoClient tidak aman di-fork → tiap worker import app sendiri (jangan preload)
+preload_app = False
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+# Path tanpa query string (%(U)s, bukan %(r)s): ?token= milik /api/stream tidak ikut tercatat
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = "-"
+
+
+def on_starting(server):
+    # Migrasi + index cukup sekali di master, sebelum worker dibuat
+    from pymongo import MongoClient
+
+    import migrations
+
+    uri = os.environ.get("MONGO_URI")
+    if uri and os.environ.get("RUN_MIGRATIONS", "1") == "1":
+        client = MongoClient(uri)
+        try:
+            applied = migrations.migrate(client.get_default_database("cmms_industri_otomasi"))
+            for number, description in applied:
+                server.log.info("Migrasi %s OK: %s", number, description)
+        finally:
+            client.close()
+    # Worker tidak perlu menjalankan migrasi lagi
+    os.environ["RUN_MIGRATIONS"] = "0"
+
+
+def post_fork(server, worker):
+    # maxPoolSize kurang dari jumlah thread = thread antre di waitQueue
+    pool = int(os.environ.get("MONGO_MAX_POOL_SIZE", 50))
+    if pool < threads:
+        server.log.warning("MONGO_MAX_POOL_SIZE (%s) < threads (%s)", pool, threads)
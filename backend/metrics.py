@@ -0,0 +1,234 @@
+# metrics.py
+# Instrumentasi request & query MongoDB, diekspos dalam format Prometheus (/metrics).
+#
+#   - hook before/after_request Flask  → latency, status, ukuran response per route
+#   - PyMongo CommandListener           → jumlah & durasi command MongoDB per route
+#   - slow request log (opsional)       → request > SLOW_REQUEST_MS dicatat beserta query-nya
+#
+# Angka disimpan per proses. Dengan gunicorn multi worker, tiap scrape hanya
+# melihat satu worker → jumlahkan di Prometheus (label instance/pod).
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+MAX_LOGGED_COMMANDS = 50   # batas query yang disimpan per request untuk slow log
+MAX_COMMAND_TEXT = 300     # panjang maksimal filter/pipeline di slow log
+BACKGROUND_ROUTE = "-"     # command di luar request (archiver, event broadcaster, ...)
+
+
+class Histogram:
+    """Histogram kumulatif ala Prometheus, satu seri per kombinasi label."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values → [count per bucket..., +Inf], sum
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            base = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, label_values, amount=1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _labels(names, values):
+    def escape(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{n}="{escape(v)}"' for n, v in zip(names, values))
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()  # request yang sedang jalan di thread ini
+        self.requests = Counter(
+            "cmms_http_requests_total", "Jumlah request HTTP", ("method", "route", "status"))
+        self.latency = Histogram(
+            "cmms_http_request_duration_seconds", "Latency request HTTP", ("method", "route"), LATENCY_BUCKETS)
+        self.response_size = Histogram(
+            "cmms_http_response_size_bytes", "Ukuran body response", ("method", "route"), SIZE_BUCKETS)
+        self.request_commands = Histogram(
+            "cmms_http_request_mongo_commands", "Jumlah command MongoDB per request", ("method", "route"), COUNT_BUCKETS)
+        self.mongo_commands = Counter(
+            "cmms_mongo_commands_total", "Jumlah command MongoDB", ("route", "command", "collection"))
+        self.mongo_failures = Counter(
+            "cmms_mongo_command_failures_total", "Command MongoDB yang gagal", ("route", "command"))
+        self.mongo_latency = Histogram(
+            "cmms_mongo_command_duration_seconds", "Durasi command MongoDB", ("command", "collection"), MONGO_BUCKETS)
+
+    # ---------- konteks request (per thread) ----------
+    def begin(self, route, keep_commands):
+        self._local.ctx = {"route": route, "commands": 0, "mongo_seconds": 0.0,
+                           "log": [] if keep_commands else None, "pending": {}}
+
+    def end(self):
+        return self._local.__dict__.pop("ctx", None)
+
+    def current(self):
+        return getattr(self._local, "ctx", None)
+
+    # ---------- pencatatan ----------
+    def record_request(self, method, route, status, seconds, size, commands):
+        with self._lock:
+            self.requests.inc((method, route, str(status)))
+            self.latency.observe((method, route), seconds)
+            self.request_commands.observe((method, route), commands)
+            if size is not None:  # response streaming tidak punya content-length
+                self.response_size.observe((method, route), size)
+
+    def record_command(self, route, command, collection, seconds, failed=False):
+        with self._lock:
+            self.mongo_commands.inc((route, command, collection))
+            self.mongo_latency.observe((command, collection), seconds)
+            if failed:
+                self.mongo_failures.inc((route, command))
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.response_size, self.request_commands,
+                           self.mongo_commands, self.mongo_failures, self.mongo_latency):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _collection_of(event_command, command_name):
+    # find/aggregate/insert/... → {"find": "workorders", ...}; getMore → {"collection": "..."}
+    value = event_command.get(command_name)
+    if isinstance(value, str):
+        return value
+    return event_command.get("collection", "")
+
+
+def _command_text(command):
+    for key in ("filter", "pipeline", "q", "query", "updates", "deletes"):
+        if key in command:
+            text = json.dumps(command[key], default=str)
+            return text if len(text) <= MAX_COMMAND_TEXT else text[:MAX_COMMAND_TEXT] + "..."
+    return ""
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Dipanggil PyMongo di thread yang menjalankan query, jadi command bisa
+    ditempelkan ke request Flask yang sedang aktif di thread itu.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def started(self, event):
+        ctx = self.metrics.current()
+        if ctx is None:
+            return
+        ctx["pending"][event.request_id] = (
+            _collection_of(event.command, event.command_name),
+            _command_text(event.command) if ctx["log"] is not None else ""
+        )
+
+    def _finish(self, event, failed):
+        seconds = event.duration_micros / 1e6
+        ctx = self.metrics.current()
+        if ctx is None:
+            self.metrics.record_command(BACKGROUND_ROUTE, event.command_name, "", seconds, failed)
+            return
+        collection, text = ctx["pending"].pop(event.request_id, ("", ""))
+        ctx["commands"] += 1
+        ctx["mongo_seconds"] += seconds
+        if ctx["log"] is not None and len(ctx["log"]) < MAX_LOGGED_COMMANDS:
+            ctx["log"].append({"command": event.command_name, "collection": collection,
+                               "ms": round(seconds * 1000, 2), "query": text, "failed": failed})
+        self.metrics.record_command(ctx["route"], event.command_name, collection, seconds, failed)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+
+def init_app(app, metrics, slow_request_ms=None):
+    """
+    Pasang hook request ke `app`. `slow_request_ms` = ambang slow log (None = mati).
+    Listener MongoDB (MongoCommandListener) dipasang terpisah saat membuat client.
+    """
+    keep_commands = slow_request_ms is not None
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.begin(route, keep_commands)
+
+    @app.after_request
+    def record(response):
+        ctx = metrics.end()
+        start = g.pop("metrics_start", None)
+        if ctx is None or start is None:
+            return response
+        seconds = time.perf_counter() - start
+        # Response streaming (export, SSE): hanya waktu sampai header terkirim, tanpa ukuran.
+        # Query di dalam generator tercatat dengan route "-".
+        size = None if response.is_streamed else response.calculate_content_length()
+        metrics.record_request(request.method, ctx["route"], response.status_code, seconds, size, ctx["commands"])
+
+        if keep_commands and seconds * 1000 >= slow_request_ms:
+            app.logger.warning("slow request %s", json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "route": ctx["route"],
+                "status": response.status_code,
+                "ms": round(seconds * 1000, 1),
+                "mongo_ms": round(ctx["mongo_seconds"] * 1000, 1),
+                "mongo_commands": ctx["commands"],
+                "queries": ctx["log"],
+            }))
+        return response
+
+    @app.teardown_request
+    def cleanup(exc):
+        # after_request tidak jalan kalau ada exception yang tidak ditangani
+        metrics.end()
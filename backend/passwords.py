@@ -0,0 +1,115 @@
+# passwords.py
+# Hash & verifikasi password di luar thread request.
+#
+# Hash password sengaja mahal (scrypt/pbkdf2). Saat ganti shift ratusan operator login
+# bersamaan → kalau dihitung langsung di handler, semua thread gunicorn sibuk hashing
+# dan API lain ikut macet. Di sini hashing dijalankan di process pool kecil per worker:
+#   - jumlah proses  : PASSWORD_HASH_WORKERS (0 = hitung langsung di thread pemanggil)
+#   - antrian maks   : PASSWORD_HASH_QUEUE tugas (sedang jalan + menunggu) per worker;
+#                      lebih dari itu langsung ditolak (PoolBusy → 503), bukan ikut antri
+#   - batas tunggu   : PASSWORD_HASH_TIMEOUT detik
+#
+# Algoritma & cost: PASSWORD_HASH_METHOD, format method Werkzeug
+# (mis. "scrypt:32768:8:1", "pbkdf2:sha256:600000"). Hash yang dibuat dengan method lain
+# (termasuk bcrypt dari seed_user.py lama) tetap bisa login, lalu di-hash ulang
+# dengan method sekarang (rehash-on-login).
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from functools import lru_cache
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import bcrypt  # hanya untuk hash lama "$2b$..." dari seed_user.py versi awal
+except ImportError:
+    bcrypt = None
+
+METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+QUEUE_LIMIT = int(os.environ.get("PASSWORD_HASH_QUEUE", 32))
+TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+
+class PoolBusy(Exception):
+    """Antrian hashing penuh / terlalu lama → request ditolak (503)."""
+
+
+# ---------- HASH (jalan di process pool) ----------
+@lru_cache(maxsize=None)
+def method_prefix(method):
+    """Prefix yang disimpan Werkzeug untuk `method` (mis. "scrypt" → "scrypt:32768:8:1")."""
+    return generate_password_hash("", method).split("$", 1)[0]
+
+
+def hash_password(password, method=None):
+    return generate_password_hash(password, method or METHOD)
+
+
+def needs_rehash(stored, method=None):
+    return stored.split("$", 1)[0] != method_prefix(method or METHOD)
+
+
+def check_password(stored, password):
+    if stored.startswith("$2"):
+        return bcrypt is not None and bcrypt.checkpw(password.encode("utf-8"), stored.encode("utf-8"))
+    return check_password_hash(stored, password)
+
+
+def verify_password(stored, password, method=None):
+    """Return (cocok, hash_baru_atau_None). hash_baru diisi kalau method hash lama sudah berbeda."""
+    if not stored or not check_password(stored, password):
+        return False, None
+    if needs_rehash(stored, method):
+        return True, hash_password(password, method)
+    return True, None
+
+
+# ---------- POOL ----------
+class HashPool:
+    def __init__(self, workers=WORKERS, queue_limit=QUEUE_LIMIT, timeout=TIMEOUT, method=METHOD):
+        self.workers = workers
+        self.timeout = timeout
+        self.method = method
+        self.slots = threading.BoundedSemaphore(queue_limit)
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                # spawn: proses anak tidak mewarisi thread / koneksi MongoDB milik worker
+                self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self.executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self.slots.acquire(blocking=False):
+            raise PoolBusy("Antrian hash password penuh")
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        # Slot dilepas saat tugas selesai (bukan saat pemanggil berhenti menunggu)
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PoolBusy("Hash password terlalu lama")
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.method)
+
+    def verify(self, stored, password):
+        """(cocok, hash_baru_atau_None), lihat verify_password."""
+        return self._run(verify_password, stored, password, self.method)
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
@@ -0,0 +1,306 @@
+# queries.py
+# Helper query & format yang dipakai bersama app.py (Flask/PyMongo)
+# dan async_app.py (Quart/Motor). Tidak bergantung ke request/DB tertentu:
+# `args` = dict-like query string (request.args).
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from serialization import Field, Schema
+
+
+# ---------- CURSOR PAGINATION (keyset) ----------
+def encode_cursor(sort_value, doc_id):
+    """Cursor opaque: base64 dari (nilai sort terakhir, _id terakhir)."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps({"v": sort_value, "id": str(doc_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Kebalikan encode_cursor. Raise ValueError kalau cursor rusak."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return datetime.fromisoformat(data["v"]), ObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Cursor tidak valid")
+
+
+def keyset_query(query, field, cursor):
+    """Tambah kondisi 'setelah cursor' untuk sort (field DESC, _id DESC)."""
+    if not cursor:
+        return query
+    last_value, last_id = decode_cursor(cursor)
+    after = {"$or": [
+        {field: {"$lt": last_value}},
+        {field: last_value, "_id": {"$lt": last_id}}
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+def parse_limit(args, default=50, maximum=200):
+    try:
+        limit = int(args.get('limit', default))
+    except ValueError:
+        raise ValueError("limit harus angka")
+    return max(1, min(limit, maximum))
+
+
+def parse_date_arg(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Format tanggal {name} tidak valid (pakai ISO 8601)")
+
+
+def build_workorder_query(args):
+    """Filter list WO dari query string: status, machineId, priority, type, assignedTo, from, to."""
+    query = {}
+    for field in ["status", "priority", "type"]:
+        value = args.get(field)
+        if value:
+            query[field] = value
+    for field in ["machineId", "assignedTo"]:
+        value = args.get(field)
+        if value:
+            try:
+                query[field] = ObjectId(value)
+            except InvalidId:
+                raise ValueError(f"{field} tidak valid")
+
+    date_from = parse_date_arg(args, 'from')
+    date_to = parse_date_arg(args, 'to')
+    if date_from or date_to:
+        query["createdAt"] = {}
+        if date_from:
+            query["createdAt"]["$gte"] = date_from
+        if date_to:
+            query["createdAt"]["$lte"] = date_to
+    return query
+
+
+def split_page(docs, limit, field):
+    """Dari hasil limit+1: return (docs halaman ini, cursor halaman berikut atau None)."""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1][field], docs[-1]["_id"])
+
+
+# ---------- NAMA MESIN / KOMPONEN ----------
+MACHINE_NAME_PROJECTION = {"machineCode": 1, "machineName": 1}
+COMPONENT_NAME_PROJECTION = {"componentCode": 1, "componentName": 1}
+
+
+# Snapshot nama yang disimpan di dokumen WO (lihat snapshots.py)
+WO_NAME_PROJECTION = {"machineCode": 1, "machineName": 1, "componentCode": 1, "componentName": 1}
+
+
+def referenced_ids(workorders):
+    """machineId & componentId unik yang namanya belum ada di snapshot WO."""
+    machine_ids = {wo["machineId"] for wo in workorders if wo.get("machineId") and "machineCode" not in wo}
+    comp_ids = {wo["componentId"] for wo in workorders if wo.get("componentId") and "componentCode" not in wo}
+    return list(machine_ids), list(comp_ids)
+
+
+def machine_label(m):
+    return f"{m['machineCode']} - {m['machineName']}"
+
+
+def component_label(c):
+    return f"{c['componentCode']} - {c['componentName']}"
+
+
+def wo_machine_label(wo, machine_names, default="Unknown Machine"):
+    """"CODE - Name" mesin WO: dari snapshot, atau dari hasil get_name_maps untuk WO lama."""
+    if "machineCode" in wo:
+        return machine_label(wo)
+    return machine_names.get(wo.get("machineId"), default)
+
+
+def wo_component_label(wo, comp_names):
+    if "componentCode" in wo:
+        return component_label(wo)
+    return comp_names.get(wo.get("componentId"), "-")
+
+
+# ---------- FORMAT RESPONSE ----------
+# ObjectId & datetime dibiarkan apa adanya; encoder JSON (serialization.py) yang mengubahnya.
+def blank_to_none(value):
+    # installDate lama bisa string kosong dari form → null, sama dengan yang belum diisi
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def long_date(value):
+    # Format tanggal riwayat maintenance yang sudah dipakai frontend ("05 March 2025")
+    return value.strftime("%d %B %Y")
+
+
+def status_times(wo):
+    """{status: waktu pertama kali status tercapai}; WO lama tanpa statusTimes → dari history."""
+    times = wo.get("statusTimes")
+    if times is None:
+        times = {}
+        for h in wo.get("history") or []:
+            if h.get("status") and h.get("status") not in times:
+                times[h["status"]] = h.get("timestamp")
+    return times
+
+
+HISTORY_SCHEMA = Schema(
+    status=Field(), timestamp=Field(), by=Field("Unknown"), note=Field()
+)
+
+WORKORDER_LIST_SCHEMA = Schema(
+    _id=Field(),
+    woNumber=Field("-"),
+    type=Field("-"),
+    priority=Field("low"),
+    status=Field("open"),
+    description=Field(""),
+    createdAt=Field(),
+    machineId=Field()
+)
+# List WO tidak butuh history (cukup statusTimes) → ambil hanya field schema + nama + statusTimes
+WO_LIST_PROJECTION = {
+    **WORKORDER_LIST_SCHEMA.projection, "componentId": 1, "statusTimes": 1, **WO_NAME_PROJECTION
+}
+
+ARCHIVE_LIST_SCHEMA = Schema(
+    _id=Field(),
+    woNumber=Field("-"),
+    type=Field("-"),
+    priority=Field("low"),
+    status=Field(),
+    machineId=Field(),
+    componentId=Field(),
+    createdAt=Field(),
+    archivedAt=Field()
+)
+ARCHIVE_LIST_PROJECTION = {**ARCHIVE_LIST_SCHEMA.projection, "statusTimes": 1, **WO_NAME_PROJECTION}
+
+MACHINE_SCHEMA = Schema(
+    _id=Field(),
+    machineCode=Field(""),
+    machineName=Field(""),
+    machineType=Field(""),
+    location=Field(""),
+    installDate=Field(),
+    status=Field("active"),
+    createdAt=Field()
+)
+
+COMPONENT_SCHEMA = Schema(
+    _id=Field(),
+    machineId=Field(),
+    componentCode=Field(""),
+    componentName=Field(""),
+    installDate=Field(convert=blank_to_none),
+    status=Field("good"),
+    lifetimeHours=Field(0),
+    lifetimeCycles=Field(0),
+    # Dihitung wear.compute_wear (None = belum ada data lifetime / pemakaian)
+    usageHours=Field(0),
+    usageCycles=Field(0),
+    remainingHours=Field(),
+    remainingCycles=Field(),
+    remainingLifePct=Field(),
+    notes=Field("")
+)
+
+USER_SCHEMA = Schema(_id=Field(), username=Field(), role=Field(), createdAt=Field())
+
+MAINTENANCE_HISTORY_SCHEMA = Schema(
+    _id=Field(),
+    machineId=Field(),
+    machineName=Field(),
+    task=Field(),
+    frequency_days=Field(),
+    last_done=Field(convert=long_date),
+    next_due=Field(convert=long_date)
+)
+
+
+def history_item(h):
+    item = HISTORY_SCHEMA.dump(h)
+    if not item["note"]:
+        del item["note"]
+    return item
+
+
+def workorder_list_item(wo, machine_names, comp_names):
+    """1 baris list WO (GET /api/workorders)."""
+    item = WORKORDER_LIST_SCHEMA.dump(wo)
+    item["machineName"] = wo_machine_label(wo, machine_names)
+    item["componentName"] = wo_component_label(wo, comp_names)
+    item["statusTimes"] = status_times(wo)
+    return item
+
+
+def archive_list_item(wo, machine_names, comp_names):
+    """1 baris tabel arsip (GET /api/workorders/archive)."""
+    item = ARCHIVE_LIST_SCHEMA.dump(wo)
+    item["machineName"] = wo_machine_label(wo, machine_names, "Unknown")
+    item["componentName"] = wo_component_label(wo, comp_names)
+    item["statusTimes"] = status_times(wo)
+    return item
+
+
+def machine_item(m):
+    return MACHINE_SCHEMA.dump(m)
+
+
+def component_item(c):
+    return COMPONENT_SCHEMA.dump(c)
+
+
+def workorder_detail(wo, machine=None, comp=None):
+    """
+    Detail WO (GET /api/workorders/<id>). Nama diambil dari snapshot di WO;
+    `machine`/`comp` hanya dipakai untuk WO lama yang belum punya snapshot.
+    history = HISTORY_KEEP entry terakhir; lengkapnya di GET /api/workorders/<id>/history
+    """
+    if 'machineCode' not in wo:
+        wo['machineName'] = machine['machineName'] if machine else "-"
+    if 'componentCode' not in wo:
+        wo['componentName'] = comp['componentName'] if comp else "-"
+    wo['statusTimes'] = status_times(wo)
+    return wo
+
+
+def maintenance_history_item(h, now):
+    """1 baris riwayat maintenance (GET /api/maintenance-history)."""
+    item = MAINTENANCE_HISTORY_SCHEMA.dump(h)
+    item["status"] = "Selesai" if h.get("next_due") and h["next_due"] > now else "Terjadwal"
+    return item
+
+
+def schedule_item(s, today):
+    """1 baris list jadwal (GET /api/schedules); `today` = date hari ini."""
+    days_left = (s['next_due'].date() - today).days
+
+    status = "on_track"
+    if days_left < 0:
+        status = "overdue"
+    elif days_left <= 7:
+        status = "due_soon"
+
+    return {
+        "_id": s['_id'],
+        "machineName": s['machineName'],
+        "task": s['task'],
+        "frequency_days": s['frequency_days'],
+        "last_done": s['last_done'].strftime("%d %b %Y"),
+        "next_due": s['next_due'].strftime("%d %b %Y"),
+        "days_left": days_left,
+        "status": status
+    }
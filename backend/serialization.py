@@ -0,0 +1,83 @@
+# serialization.py
+# JSON cepat (orjson) untuk Flask/Quart + schema response.
+#
+# OrjsonProvider dipasang sebagai app.json, jadi jsonify() dan request.get_json()
+# otomatis lewat orjson. ObjectId → string, datetime → ISO 8601; datetime naive dari
+# MongoDB = UTC → selalu diberi akhiran "Z" (browser membaca format tanpa offset sebagai
+# waktu lokal), NaN → null. Handler tidak perlu lagi str()/isoformat() per field.
+#
+# Schema = daftar field response: dipakai untuk projection query (hanya field yang
+# dikirim yang diambil dari MongoDB) dan untuk membentuk dict response.
+from flask import abort, jsonify, request
+from flask.json.provider import JSONProvider
+from bson import ObjectId
+import orjson
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """obj → bytes JSON."""
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj) + b"\n", mimetype="application/json")
+
+
+def json_body():
+    """Body request sebagai dict (di-decode orjson). Body kosong/bukan object → 400."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        response = jsonify({"error": "Body harus JSON object"})
+        response.status_code = 400
+        abort(response)
+    return data
+
+
+# ---------- SCHEMA RESPONSE ----------
+class Field:
+    __slots__ = ("default", "source", "convert")
+
+    def __init__(self, default=None, source=None, convert=None):
+        self.default = default
+        self.source = source      # nama field di dokumen (default = nama di response)
+        self.convert = convert    # fungsi opsional untuk nilai yang butuh format khusus
+
+
+class Schema:
+    """
+    Schema(woNumber=Field("-"), status=Field("open"), ...)
+    .projection → projection MongoDB; .dump(doc) → dict response.
+    """
+
+    def __init__(self, **fields):
+        self.fields = [(name, f.source or name, f.default, f.convert) for name, f in fields.items()]
+        self.projection = {source: 1 for _, source, _, _ in self.fields}
+
+    def dump(self, doc):
+        out = {}
+        for name, source, default, convert in self.fields:
+            value = doc.get(source)
+            if value is None:
+                value = default
+            elif convert is not None:
+                value = convert(value)
+            out[name] = value
+        return out
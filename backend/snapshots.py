@@ -0,0 +1,74 @@
+# snapshots.py
+# Snapshot nama mesin/komponen di dokumen WO (workorders & workorders_archive).
+#
+# Field di WO: machineCode, machineName, componentCode, componentName.
+# List WO / arsip / export cukup baca 1 collection, tanpa join ke machines/components.
+# Konsistensi:
+#   - create_workorder mengisi snapshot dari mesin & komponen saat WO dibuat
+#   - rename mesin/komponen → fan-out update_many ke semua WO yang memakainya
+#   - WO lama diisi sekali lewat backfill (migrasi versi 6)
+# WO tanpa snapshot (mis. mesinnya sudah dihapus sebelum backfill) tetap
+# di-resolve lewat app.get_name_maps.
+from pymongo import UpdateOne
+
+WO_COLLECTIONS = ("workorders", "workorders_archive")
+MACHINE_FIELDS = ("machineCode", "machineName")
+COMPONENT_FIELDS = ("componentCode", "componentName")
+
+
+def machine_snapshot(machine):
+    return {f: machine.get(f, "") for f in MACHINE_FIELDS} if machine else {}
+
+
+def component_snapshot(comp):
+    return {f: comp.get(f, "") for f in COMPONENT_FIELDS} if comp else {}
+
+
+def propagate_machine(db, machine):
+    """Tulis ulang snapshot nama `machine` di semua WO aktif & arsip. Return jumlah WO."""
+    snapshot = machine_snapshot(machine)
+    return sum(
+        db[name].update_many({"machineId": machine["_id"]}, {"$set": snapshot}).modified_count
+        for name in WO_COLLECTIONS
+    )
+
+
+def propagate_component(db, comp):
+    snapshot = component_snapshot(comp)
+    return sum(
+        db[name].update_many({"componentId": comp["_id"]}, {"$set": snapshot}).modified_count
+        for name in WO_COLLECTIONS
+    )
+
+
+def backfill(db, batch_size=1000):
+    """Isi snapshot untuk WO yang belum punya, per batch (nama di-resolve dengan 1 $in per batch)."""
+    total = 0
+    for name in WO_COLLECTIONS:
+        collection = db[name]
+        last_id = None
+        while True:
+            query = {"machineCode": {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = list(collection.find(query, {"machineId": 1, "componentId": 1}).sort("_id", 1).limit(batch_size))
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+
+            machine_ids = list({d["machineId"] for d in docs if d.get("machineId")})
+            comp_ids = list({d["componentId"] for d in docs if d.get("componentId")})
+            machines = {m["_id"]: m for m in db.machines.find({"_id": {"$in": machine_ids}}, dict.fromkeys(MACHINE_FIELDS, 1))}
+            comps = {c["_id"]: c for c in db.components.find({"_id": {"$in": comp_ids}}, dict.fromkeys(COMPONENT_FIELDS, 1))}
+
+            ops = []
+            for doc in docs:
+                machine = machines.get(doc.get("machineId"))
+                if not machine:
+                    continue  # mesin sudah dihapus → biarkan, nama di-resolve saat dibaca
+                snapshot = machine_snapshot(machine)
+                snapshot.update(component_snapshot(comps.get(doc.get("componentId"))))
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": snapshot}))
+            if ops:
+                total += collection.bulk_write(ops, ordered=False).modified_count
+    return total
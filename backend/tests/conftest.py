@@ -0,0 +1,113 @@
+# conftest.py
+# Fixture bersama: app.py dengan MongoDB palsu (mongomock), tanpa server MongoDB.
+#
+#   cd backend && python -m pytest -q tests
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/cmms_test")
+os.environ.setdefault("SECRET_KEY", "secret-key-khusus-test-minimal-32-byte")
+os.environ["RUN_MIGRATIONS"] = "0"
+os.environ["EVENT_SOURCE"] = "polling"  # mongomock tidak punya change stream
+# Hash password langsung di thread test (tanpa process pool), cost rendah supaya cepat
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+import flask_pymongo  # noqa: E402
+import mongomock  # noqa: E402
+
+
+class MockMongoClient(mongomock.MongoClient):
+    """mongomock tidak kenal opsi pool / command listener → dibuang."""
+
+    def __init__(self, *args, **kwargs):
+        for option in ("event_listeners", "maxPoolSize", "minPoolSize", "waitQueueTimeoutMS"):
+            kwargs.pop(option, None)
+        super().__init__(*args, **kwargs)
+
+
+flask_pymongo.MongoClient = MockMongoClient
+
+QUERY_METHODS = ("find", "find_one", "aggregate", "count_documents", "distinct", "insert_one", "insert_many",
+                 "update_one", "update_many", "find_one_and_update", "delete_one", "delete_many", "bulk_write")
+
+# Server MongoDB menjalankan tiap operasi secara atomik per dokumen; mongomock tidak thread-safe
+# (dict berubah saat diiterasi). Semua operasi collection + iterasi cursor dikunci 1 lock, supaya
+# test konkuren menguji logika app (filter atomik, index unique), bukan race di dalam mongomock.
+_mongomock_lock = threading.RLock()
+
+
+def _serialized(method):
+    def wrapper(*args, **kwargs):
+        with _mongomock_lock:
+            return method(*args, **kwargs)
+    return wrapper
+
+
+for _name in QUERY_METHODS + ("create_index", "drop_index", "index_information"):
+    setattr(mongomock.Collection, _name, _serialized(getattr(mongomock.Collection, _name)))
+mongomock.collection.Cursor.__next__ = _serialized(mongomock.collection.Cursor.__next__)
+
+import app as appmod  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    for name in appmod.db.list_collection_names():
+        appmod.db.drop_collection(name)
+    appmod.user_cache.clear()
+    appmod.summary_cache.clear()
+    return appmod.db
+
+
+@pytest.fixture
+def client(db):
+    return appmod.app.test_client()
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user(role, username) → (user, headers Authorization)."""
+    def make(role, username=None):
+        username = username or f"{role}-{db.users.count_documents({})}"
+        result = db.users.insert_one({"username": username, "password": "x", "role": role,
+                                      "created_at": datetime.utcnow()})
+        user = db.users.find_one({"_id": result.inserted_id})
+        token = jwt.encode({"user_id": str(user["_id"]), "exp": datetime.utcnow() + timedelta(hours=1)},
+                           appmod.app.config["SECRET_KEY"], algorithm="HS256")
+        return user, {"Authorization": f"Bearer {token}"}
+    return make
+
+
+@pytest.fixture
+def queries_run(monkeypatch):
+    """
+    Daftar (collection, operasi) yang dijalankan selama test. mongomock tidak memanggil
+    command listener (metrics.py), jadi method Collection dibungkus langsung; panggilan
+    bersarang di dalam mongomock (find_one → find) dihitung 1.
+    """
+    log = []
+    local = threading.local()
+
+    def counted(name, method):
+        def wrapper(self, *args, **kwargs):
+            if getattr(local, "active", False):
+                return method(self, *args, **kwargs)
+            log.append((self.name, name))
+            local.active = True
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                local.active = False
+        return wrapper
+
+    for name in QUERY_METHODS:
+        monkeypatch.setattr(mongomock.Collection, name, counted(name, getattr(mongomock.Collection, name)))
+    return log
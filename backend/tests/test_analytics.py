@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import analytics
+
+JAN = datetime(2025, 1, 1)
+# 31 hari Januari (s/d 23:59:59) dikurangi 20 jam perbaikan, dibagi 4 kerusakan
+JAN_MTBF = round((31 * 24 - 1 / 3600 - 20) / 4, 2)
+
+
+def finished_wo(machine_id, wo_type, created, hours, status="completed"):
+    return {"machineId": machine_id, "componentId": None, "type": wo_type, "status": status,
+            "createdAt": created, "statusTimes": {"open": created, status: created + timedelta(hours=hours)}}
+
+
+@pytest.fixture
+def fixture_wos(db):
+    machine_id = db.machines.insert_one({"machineCode": "CNC-01", "machineName": "CNC Lathe"}).inserted_id
+    active = db.workorders.insert_many([
+        finished_wo(machine_id, "breakdown", JAN.replace(day=10), 4),
+        finished_wo(machine_id, "corrective", JAN.replace(day=20), 8),
+        finished_wo(machine_id, "preventive", JAN.replace(day=15), 3),
+        finished_wo(machine_id, "corrective", JAN.replace(day=25), 2, status="closed"),  # langsung closed
+        {"machineId": machine_id, "type": "breakdown", "status": "open", "createdAt": JAN.replace(day=28),
+         "statusTimes": {"open": JAN.replace(day=28)}},
+    ]).inserted_ids
+    db.workorders_archive.insert_one(finished_wo(machine_id, "breakdown", JAN.replace(day=5), 6, status="closed"))
+    return machine_id, active
+
+
+def test_rebuild_gives_expected_mttr_and_mtbf(db, fixture_wos):
+    machine_id, _ = fixture_wos
+
+    assert analytics.rebuild_rollups(db) == 1
+    report = analytics.reliability_report(db, "2025-01", "2025-01", "machine")
+
+    assert report == [{
+        "key": machine_id, "name": "CNC-01 - CNC Lathe", "completed": 5, "preventive": 1, "failures": 4,
+        "repairHours": 20.0, "mttrHours": 5.0, "mtbfHours": JAN_MTBF,
+    }]
+    # Semua WO selesai sudah ditandai → record_finished tidak menghitung ulang
+    assert db.workorders.count_documents({"rolledUpAt": {"$exists": True}}) == 4
+
+
+def test_record_finished_counts_each_work_order_once(db, fixture_wos):
+    _, active = fixture_wos
+    breakdown = active[0]
+
+    assert analytics.record_finished(db, breakdown) is True
+    assert analytics.record_finished(db, breakdown) is False  # selesai 2x (completed → closed)
+    assert analytics.record_finished(db, active[4]) is False  # belum selesai
+
+    rollup = db.wo_rollups.find_one()
+    assert (rollup["completed"], rollup["failures"], rollup["repairHours"]) == (1, 1, 4.0)
+
+
+def test_incremental_rollups_match_rebuild(db, fixture_wos):
+    _, active = fixture_wos
+    db.workorders_archive.delete_many({})  # arsip tidak lewat record_finished
+    for wo_id in active:
+        analytics.record_finished(db, wo_id)
+    incremental = {r["month"]: {f: r[f] for f in analytics.ROLLUP_FIELDS} for r in db.wo_rollups.find()}
+
+    db.workorders.update_many({}, {"$unset": {"rolledUpAt": ""}})
+    analytics.rebuild_rollups(db)
+    rebuilt = {r["month"]: {f: r[f] for f in analytics.ROLLUP_FIELDS} for r in db.wo_rollups.find()}
+
+    assert incremental == rebuilt == {"2025-01": {"completed": 4, "failures": 3, "repairHours": 14.0, "preventive": 1}}
+
+
+def test_status_updates_through_api_roll_up_once(client, db, make_user):
+    _, headers = make_user("supervisor")
+    machine_id = db.machines.insert_one({"machineCode": "M-01", "machineName": "Press"}).inserted_id
+    wo_id = db.workorders.insert_one({"woNumber": "WO-2025-01-0001", "machineId": machine_id, "type": "breakdown",
+                                      "status": "in_progress", "assignedTo": None,
+                                      "createdAt": datetime.now() - timedelta(hours=2)}).inserted_id
+
+    for status in ("completed", "closed"):
+        response = client.put(f"/api/workorders/{wo_id}/status", json={"status": status}, headers=headers)
+        assert response.status_code == 200
+
+    rollups = list(db.wo_rollups.find())
+    assert len(rollups) == 1 and rollups[0]["completed"] == 1 and rollups[0]["failures"] == 1
+    assert rollups[0]["repairHours"] == pytest.approx(2, abs=0.1)
+
+
+def test_deleting_a_rolled_up_work_order_removes_it(db, fixture_wos):
+    _, active = fixture_wos
+    analytics.record_finished(db, active[1])
+
+    wo = db.workorders.find_one_and_delete({"_id": active[1]}, projection=analytics.ROLLUP_PROJECTION)
+    analytics.remove_finished(db, wo)
+
+    rollup = db.wo_rollups.find_one()
+    assert (rollup["completed"], rollup["failures"], rollup["repairHours"]) == (0, 0, 0)
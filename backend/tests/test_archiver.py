@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import archiver
+import snapshots
+
+
+def closed_workorders(db, count):
+    updated = datetime(2025, 1, 1)
+    return db.workorders.insert_many([{"woNumber": f"WO-2025-01-{i:04d}", "status": "closed",
+                                       "updatedAt": updated, "closedAt": updated} for i in range(count)]).inserted_ids
+
+
+def archivable(doc):
+    return {**doc, "archivedBy": "test"} if doc.get("status") in archiver.ARCHIVABLE_STATUS else None
+
+
+def test_archive_does_not_delete_work_orders_changed_after_read(db):
+    reopened, renamed, untouched = closed_workorders(db, 3)
+    machine_id = db.machines.insert_one({"machineCode": "CNC-01", "machineName": "Lama"}).inserted_id
+    db.workorders.update_one({"_id": renamed}, {"$set": {"machineId": machine_id, "machineCode": "CNC-01",
+                                                         "machineName": "Lama"}})
+    docs = list(db.workorders.find())
+    # Berubah di antara baca & hapus: 1 WO dibuka lagi, 1 WO kena rename mesin (updatedAt tidak berubah)
+    db.workorders.update_one({"_id": reopened}, {"$set": {"status": "in_progress", "updatedAt": datetime(2025, 2, 1)}})
+    assert snapshots.propagate_machine(db, {"_id": machine_id, "machineCode": "CNC-01", "machineName": "Baru"}) == 1
+
+    moved = archiver.move_documents(db, db.workorders, db.workorders_archive, docs, archivable)
+
+    assert moved == 2
+    assert [wo["_id"] for wo in db.workorders.find()] == [reopened]
+    assert db.workorders.find_one({"_id": reopened})["status"] == "in_progress"
+    assert sorted(wo["_id"] for wo in db.workorders_archive.find()) == sorted([renamed, untouched])
+    # Salinan basi diganti versi terbaru
+    assert db.workorders_archive.find_one({"_id": renamed})["machineName"] == "Baru"
+
+
+def test_background_archiver_lock_has_one_owner(db):
+    assert archiver.acquire_lock(db, archiver.LOCK_ID, "worker-1", 60)
+    assert not archiver.acquire_lock(db, archiver.LOCK_ID, "worker-2", 60)
+    assert archiver.acquire_lock(db, archiver.LOCK_ID, "worker-1", 60)  # perpanjang
+
+    # Pemegang mati → lease habis → worker lain ambil alih
+    db.locks.update_one({"_id": archiver.LOCK_ID}, {"$set": {"expiresAt": datetime.utcnow() - timedelta(seconds=1)}})
+    assert archiver.acquire_lock(db, archiver.LOCK_ID, "worker-2", 60)
+    assert not archiver.acquire_lock(db, archiver.LOCK_ID, "worker-1", 60)
+
+
+def test_bulk_restore_skips_work_orders_already_active(db):
+    live, archived_only = closed_workorders(db, 2)
+    archiver.archive_workorders(db, [live, archived_only], "test")
+    # Salinan lain dengan _id yang sama sudah aktif lagi (mis. dipulihkan lalu dikerjakan ulang)
+    db.workorders.insert_one({"_id": live, "woNumber": "WO-2025-01-0000", "status": "in_progress"})
+
+    restored, skipped = archiver.restore_workorders(db, [live, archived_only])
+
+    assert restored == 1
+    assert skipped == [{"_id": str(live), "reason": "sudah ada di aktif"}]
+    assert db.workorders.find_one({"_id": live})["status"] == "in_progress"
+    assert db.workorders_archive.find_one({"_id": live}) is not None
+    assert db.workorders.find_one({"_id": archived_only})["status"] == "closed"
+
+
+def test_restore_route_rejects_work_order_already_active(client, db, make_user):
+    _, headers = make_user("supervisor")
+    wo_id, = closed_workorders(db, 1)
+    archiver.archive_workorders(db, [wo_id], "test")
+    db.workorders.insert_one({"_id": wo_id, "woNumber": "WO-2025-01-0000", "status": "open"})
+
+    assert client.post(f"/api/workorders/archive/{wo_id}/restore", headers=headers).status_code == 400
+    assert client.post(f"/api/workorders/archive/{ObjectId()}/restore", headers=headers).status_code == 404
+    assert db.workorders.find_one({"_id": wo_id})["status"] == "open"
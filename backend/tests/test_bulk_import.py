@@ -0,0 +1,40 @@
+import bulk_import
+
+
+def test_mixed_batch_keeps_good_rows_and_reports_bad_ones(client, db, make_user):
+    _, headers = make_user("admin")
+    rows = [
+        {"machineCode": "cnc-01", "machineName": "CNC", "machineType": "CNC", "location": "A", "installDate": "2024-01-01"},
+        {"machineCode": 123, "machineName": "Press", "machineType": "Press", "location": "B", "installDate": "2024-01-02"},
+        {"machineCode": {"x": 1}, "machineName": "Robot", "machineType": "Robot", "location": "C", "installDate": "2024-01-03"},
+        {"machineCode": "cnc-02", "machineName": "CNC 2", "machineType": "CNC", "location": "A"},
+        "bukan object",
+    ]
+
+    response = client.post("/api/machines/bulk", json=rows, headers=headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["inserted"] == 2
+    assert [e["row"] for e in body["errors"]] == [3, 4, 5]
+    assert sorted(db.machines.distinct("machineCode")) == ["123", "CNC-01"]
+
+
+def test_csv_body_is_read_as_a_stream(client, db, make_user):
+    _, headers = make_user("admin")
+    machine_id = db.machines.insert_one({"machineCode": "CNC-01"}).inserted_id
+    csv_body = "\ufeffcomponentCode,componentName,lifetimeHours\nbrg-1,Bearing,100\nbrg-2,,200\nbrg-3,\"Motor, 3 fasa\",x\nbrg-4,Belt,\n"
+
+    response = client.post(f"/api/machines/{machine_id}/components/bulk", data=csv_body.encode("utf-8"),
+                            headers={**headers, "Content-Type": "text/csv"})
+
+    body = response.get_json()
+    assert body["inserted"] == 2
+    assert [e["row"] for e in body["errors"]] == [2, 3]
+    assert sorted(db.components.distinct("componentCode")) == ["BRG-1", "BRG-4"]
+
+
+def test_text_coerces_scalars():
+    assert bulk_import._text({"a": 42}, "a") == "42"
+    assert bulk_import._text({"a": "  x "}, "a") == "x"
+    assert bulk_import._text({}, "a") is None
@@ -0,0 +1,60 @@
+import threading
+
+TECHNICIANS = 12
+
+
+def run_together(count, action):
+    """Jalankan action(index) dari `count` thread yang mulai bersamaan, return hasilnya per index."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        results[index] = action(index)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_claim_has_exactly_one_winner(client, db, make_user):
+    technicians = [make_user("technician", f"teknisi-{i}") for i in range(TECHNICIANS)]
+    wo_id = db.workorders.insert_one({"woNumber": "WO-2025-01-0003", "status": "open", "assignedTo": None}).inserted_id
+
+    responses = run_together(TECHNICIANS, lambda i: client.post(f"/api/workorders/{wo_id}/claim",
+                                                                headers=technicians[i][1]))
+
+    statuses = [r.status_code for r in responses]
+    assert statuses.count(200) == 1
+    assert sorted(set(statuses)) == [200, 403]
+    winner = technicians[statuses.index(200)][0]
+    assert all(r.get_json()["taken_by"] == winner["username"] for r in responses if r.status_code == 403)
+    wo = db.workorders.find_one({"_id": wo_id})
+    assert wo["assignedTo"] == winner["_id"] and wo["status"] == "in_progress"
+    assert db.workorder_events.count_documents({"woId": wo_id}) == 1
+
+
+def test_concurrent_start_has_exactly_one_winner(client, db, make_user):
+    technicians = [make_user("technician", f"teknisi-{i}") for i in range(TECHNICIANS)]
+    wo_id = db.workorders.insert_one({"woNumber": "WO-2025-01-0001", "status": "open", "assignedTo": None}).inserted_id
+    statuses = run_together(TECHNICIANS, lambda i: client.put(
+        f"/api/workorders/{wo_id}/status", json={"status": "in_progress"}, headers=technicians[i][1]).status_code)
+
+    assert statuses.count(200) == 1
+    assert sorted(set(statuses)) == [200, 403]
+    winner = technicians[statuses.index(200)][0]
+    wo = db.workorders.find_one({"_id": wo_id})
+    assert wo["assignedTo"] == winner["_id"] and wo["status"] == "in_progress"
+
+
+def test_start_does_not_claim_a_wo_that_is_not_open(client, db, make_user):
+    _, headers = make_user("technician")
+    wo_id = db.workorders.insert_one({"woNumber": "WO-2025-01-0002", "status": "completed", "assignedTo": None}).inserted_id
+
+    response = client.put(f"/api/workorders/{wo_id}/status", json={"status": "in_progress"}, headers=headers)
+
+    assert response.status_code == 409
+    assert db.workorders.find_one({"_id": wo_id})["assignedTo"] is None
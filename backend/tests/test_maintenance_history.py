@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+
+def test_maintenance_history_response(client, db, make_user):
+    _, headers = make_user("operator")
+    machine_id = ObjectId()
+    now = datetime.now()
+    db.maintenance_schedules.insert_many([
+        {"machineId": machine_id, "machineName": "CNC Milling 5 Axis", "task": "Pelumasan", "frequency_days": 30,
+         "last_done": datetime(2025, 3, 5), "next_due": now + timedelta(days=10), "createdBy": "seed"},
+        {"machineId": ObjectId(), "machineName": "KUKA KR 20", "task": "Kalibrasi", "frequency_days": 7,
+         "last_done": datetime(2025, 1, 2), "next_due": now - timedelta(days=1), "createdBy": "seed"},
+    ])
+
+    response = client.get("/api/maintenance-history", headers=headers)
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert [r["task"] for r in rows] == ["Pelumasan", "Kalibrasi"]  # last_done terbaru dulu
+    assert rows[0] == {
+        "_id": rows[0]["_id"], "machineId": str(machine_id), "machineName": "CNC Milling 5 Axis",
+        "task": "Pelumasan", "frequency_days": 30, "last_done": "05 March 2025",
+        "next_due": (now + timedelta(days=10)).strftime("%d %B %Y"), "status": "Selesai",
+    }
+    assert rows[1]["status"] == "Terjadwal"
+
+    response = client.get(f"/api/maintenance-history?machineId={machine_id}", headers=headers)
+    assert [r["task"] for r in response.get_json()] == ["Pelumasan"]
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from pymongo import MongoClient
+
+import migrations
+
+
+def test_unique_index_reports_duplicate_usernames(db):
+    db.users.insert_many([{"username": "budi", "role": "technician"}, {"username": "budi", "role": "operator"},
+                          {"username": "sari", "role": "admin"}])
+
+    with pytest.raises(migrations.DuplicateKeys) as error:
+        migrations.migrate(db)
+
+    assert "budi" in str(error.value) and "sari" not in str(error.value)
+    assert migrations.current_version(db) == 0
+    assert "username_1" not in db.users.index_information()
+
+
+def test_old_migrations_do_not_read_current_indexes(db, monkeypatch):
+    monkeypatch.setattr(migrations, "INDEXES", [])
+
+    migrations.create_initial_indexes(db)
+
+    assert "woNumber_1" in db.workorders.index_information()
+    assert not db.workorders.index_information()["woNumber_1"].get("unique")
+
+
+def _served_by(keys, query, sort):
+    """Perkiraan kasar query planner: prefix equality, lalu sort (atau range) di field berikutnya."""
+    fields = [field for field, _ in keys]
+    equality = {field for field, value in query.items() if not isinstance(value, dict)}
+    ranges = {field for field, value in query.items() if isinstance(value, dict)}
+    if set(fields[:len(equality)]) != equality:
+        return False
+    rest = list(keys)[len(equality):]
+    if sort:
+        head = rest[:len(sort)]
+        if [field for field, _ in head] != [field for field, _ in sort]:
+            return False
+        directions = [(d, s) for (_, d), (_, s) in zip(head, sort)]
+        return all(d == s for d, s in directions) or all(d == -s for d, s in directions)
+    return bool(equality) or (bool(rest) and rest[0][0] in ranges)
+
+
+def test_every_route_query_has_an_index():
+    missing = [route for route, collection, query, sort in migrations.ROUTE_QUERIES
+               if not any(spec["collection"] == collection and _served_by(spec["keys"], query, sort)
+                          for spec in migrations.INDEXES)]
+    assert missing == []
+
+
+@pytest.mark.skipif(not os.environ.get("MONGO_TEST_URI"), reason="butuh MongoDB asli (MONGO_TEST_URI) untuk explain()")
+def test_no_route_query_uses_collscan():
+    client = MongoClient(os.environ["MONGO_TEST_URI"])
+    client.drop_database("cmms_test_indexes")
+    try:
+        db = client.get_database("cmms_test_indexes")
+        migrations.migrate(db)
+        assert migrations.find_collscans(db) == []
+    finally:
+        client.drop_database("cmms_test_indexes")
+        client.close()
@@ -0,0 +1,63 @@
+import pytest
+
+import app as appmod
+import passwords
+
+
+def add_user(db, username, stored_hash):
+    db.users.insert_one({"username": username, "password": stored_hash, "role": "technician"})
+
+
+def test_login_returns_503_when_hash_pool_is_full(client, db, monkeypatch):
+    add_user(db, "budi", passwords.hash_password("rahasia123"))
+    pool = passwords.HashPool(workers=1, queue_limit=2)
+    monkeypatch.setattr(appmod, "password_pool", pool)
+    # Semua slot antrian dipegang login lain yang sedang di-hash
+    assert pool.slots.acquire(blocking=False) and pool.slots.acquire(blocking=False)
+
+    response = client.post("/api/login", json={"username": "budi", "password": "rahasia123"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert pool.executor is None  # ditolak sebelum tugas dikirim ke process pool
+
+    pool.slots.release()
+    pool.slots.release()
+    monkeypatch.setattr(pool, "workers", 0)  # hitung langsung, tanpa spawn proses di test
+    assert client.post("/api/login", json={"username": "budi", "password": "rahasia123"}).status_code == 200
+
+
+def test_register_returns_503_when_hash_pool_is_full(client, db, monkeypatch):
+    pool = passwords.HashPool(workers=1, queue_limit=1)
+    monkeypatch.setattr(appmod, "password_pool", pool)
+    assert pool.slots.acquire(blocking=False)
+
+    response = client.post("/api/register", json={"username": "sari", "password": "rahasia123"})
+
+    assert response.status_code == 503
+    assert db.users.count_documents({"username": "sari"}) == 0
+
+
+def test_login_upgrades_legacy_bcrypt_hash(client, db):
+    bcrypt = pytest.importorskip("bcrypt")
+    legacy = bcrypt.hashpw(b"teknisi123", bcrypt.gensalt(rounds=4)).decode()
+    add_user(db, "legacy", legacy)
+
+    assert client.post("/api/login", json={"username": "legacy", "password": "salah"}).status_code == 401
+    assert db.users.find_one({"username": "legacy"})["password"] == legacy
+
+    assert client.post("/api/login", json={"username": "legacy", "password": "teknisi123"}).status_code == 200
+    stored = db.users.find_one({"username": "legacy"})["password"]
+    assert stored != legacy and not passwords.needs_rehash(stored)
+    assert passwords.check_password(stored, "teknisi123")
+
+
+def test_login_rehashes_when_method_changes(client, db):
+    old = passwords.hash_password("rahasia123", "pbkdf2:sha256:500")
+    add_user(db, "lama", old)
+
+    assert client.post("/api/login", json={"username": "lama", "password": "rahasia123"}).status_code == 200
+
+    stored = db.users.find_one({"username": "lama"})["password"]
+    assert stored.startswith(passwords.method_prefix(passwords.METHOD) + "$")
+    assert client.post("/api/login", json={"username": "lama", "password": "rahasia123"}).status_code == 200
@@ -0,0 +1,57 @@
+# Regresi jumlah query MongoDB per route (N+1, query tambahan) tanpa mongod: skenario
+# benchmarks/bench_routes.py dijalankan di mongomock dengan dataset seed_data.py kecil,
+# lalu dibandingkan dengan benchmarks/baselines/route_queries.json.
+#
+# Rekam ulang setelah perubahan yang disengaja:
+#   SAVE_ROUTE_BASELINE=1 python -m pytest -q tests/test_route_queries.py
+import json
+import os
+import sys
+
+import mongomock
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_routes  # noqa: E402
+import seed_data  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(bench_routes.BASELINE_PATH), "route_queries.json")
+SEED_ARGS = ["--workorders", "200", "--schedules", "20", "--technicians", "3"]
+
+
+@pytest.fixture
+def seeded(db, monkeypatch):
+    # Index dilewati: mongomock mengabaikan partialFilterExpression index unique
+    monkeypatch.setattr(seed_data.migrations, "ensure_indexes", lambda db: None)
+    seed_data.seed(db, seed_data.parse_args(SEED_ARGS))
+    for name in bench_routes.QUERY_METHODS:
+        monkeypatch.setattr(mongomock.Collection, name, bench_routes.queries.wrap(getattr(mongomock.Collection, name)))
+    ids = bench_routes.sample_ids()
+    return bench_routes.bench_user(), ids, bench_routes.build_cases(ids)
+
+
+def test_every_route_is_benchmarked(seeded):
+    _, _, cases = seeded
+    assert bench_routes.uncovered_routes(cases) == []
+
+
+def test_route_queries_not_above_baseline(seeded, client):
+    headers, ids, cases = seeded
+    results = {}
+    for case in cases:
+        result = bench_routes.run_case(client, headers, case, ids, iterations=2, warmup=1)
+        assert all(status < 400 for status in result["status"]), case.name
+        results[case.name] = result["queries"]
+
+    if os.environ.get("SAVE_ROUTE_BASELINE"):
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"meta": {"seedArgs": SEED_ARGS, "counted": list(bench_routes.QUERY_METHODS)},
+                       "routes": dict(sorted(results.items()))}, f, indent=2)
+            f.write("\n")
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)["routes"]
+    assert sorted(baseline) == sorted(results), "route baru / hilang, rekam ulang baseline"
+    regressions = {name: f"{baseline[name]} → {count}" for name, count in results.items() if count > baseline[name]}
+    assert regressions == {}
@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import counters
+import migrations
+import scheduler
+
+NOW = datetime(2025, 3, 10, 8, 0)
+
+
+def seed_schedules(db, count):
+    machine_id = db.machines.insert_one({"machineCode": "CNC-01", "machineName": "CNC Lathe"}).inserted_id
+    db.maintenance_schedules.insert_many([{
+        "machineId": machine_id, "machineName": "CNC Lathe", "task": f"Pelumasan {i}", "frequency_days": 7,
+        "last_done": NOW - timedelta(days=10), "next_due": NOW - timedelta(days=3, minutes=i),
+    } for i in range(count)])
+
+
+def test_repeated_sweep_creates_one_wo_per_due_date(db):
+    migrations.ensure_indexes(db)
+    seed_schedules(db, 30)
+
+    first = scheduler.sweep_due_schedules(db, now=NOW, batch_size=7)
+    second = scheduler.sweep_due_schedules(db, now=NOW, batch_size=7)
+
+    assert first == {"due": 30, "created": 30, "rolled": 30}
+    assert second == {"due": 0, "created": 0, "rolled": 0}
+    assert db.workorders.count_documents({}) == 30
+    assert all(s["next_due"] > NOW for s in db.maintenance_schedules.find())
+
+
+def test_sweep_after_crash_between_insert_and_roll_forward(db):
+    migrations.ensure_indexes(db)
+    seed_schedules(db, 5)
+    schedules = list(db.maintenance_schedules.find())
+    # WO sudah dibuat untuk 2 jadwal, tapi proses mati sebelum next_due dimajukan
+    db.workorders.insert_many([scheduler.build_workorder(s, None, f"WO-2025-03-900{i}", NOW)
+                               for i, s in enumerate(schedules[:2])])
+
+    result = scheduler.sweep_due_schedules(db, now=NOW)
+
+    assert result == {"due": 5, "created": 3, "rolled": 5}
+    assert db.workorders.count_documents({}) == 5
+    assert len(db.workorders.distinct("scheduleId")) == 5
+
+
+def test_parallel_sweeps_do_not_duplicate(db):
+    migrations.ensure_indexes(db)
+    seed_schedules(db, 40)
+    barrier = threading.Barrier(4)
+    results = []
+
+    def sweep():
+        barrier.wait()
+        results.append(scheduler.sweep_due_schedules(db, now=NOW, batch_size=10))
+
+    threads = [threading.Thread(target=sweep) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4
+    assert sum(r["created"] for r in results) == 40
+    assert db.workorders.count_documents({}) == 40
+    assert len(db.workorders.distinct("woNumber")) == 40
+
+
+def test_wo_number_clash_keeps_schedule_due(db):
+    migrations.ensure_indexes(db)
+    seed_schedules(db, 3)
+    # Nomor pertama yang akan diambil counter sudah dipakai WO lain → bentrok index woNumber
+    db.workorders.insert_one({"woNumber": counters.format_wo_number(NOW.strftime("%Y-%m"), 1), "status": "open"})
+
+    with pytest.raises(BulkWriteError):
+        scheduler.sweep_due_schedules(db, now=NOW)
+
+    # 2 jadwal lain selesai; jadwal yang WO-nya gagal tetap jatuh tempo untuk sweep berikutnya
+    assert db.workorders.count_documents({"scheduleId": {"$exists": True}}) == 2
+    assert db.maintenance_schedules.count_documents({"next_due": {"$lte": NOW}}) == 1
+
+    result = scheduler.sweep_due_schedules(db, now=NOW)
+    assert result == {"due": 1, "created": 1, "rolled": 1}
+    assert db.workorders.count_documents({"scheduleId": {"$exists": True}}) == 3
+
+
+def test_background_scheduler_waits_for_lock(db):
+    migrations.ensure_indexes(db)
+    seed_schedules(db, 2)
+    db.locks.insert_one({"_id": scheduler.LOCK_ID, "owner": "worker-lain",
+                         "expiresAt": datetime.utcnow() + timedelta(hours=1)})
+
+    stop = scheduler.start_background_scheduler(db, interval_seconds=0.05)
+    try:
+        time.sleep(0.3)
+        assert db.workorders.count_documents({}) == 0
+        assert db.counters.count_documents({}) == 0  # tidak ada nomor WO yang terbuang
+
+        # Lease pemegang lama habis → worker ini mengambil alih
+        db.locks.update_one({"_id": scheduler.LOCK_ID}, {"$set": {"expiresAt": datetime.utcnow()}})
+        deadline = time.time() + 5
+        while db.workorders.count_documents({}) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+    assert db.workorders.count_documents({}) == 2
@@ -0,0 +1,27 @@
+import seed_data
+
+
+def test_default_seed_keeps_demo_output(db, monkeypatch):
+    monkeypatch.setattr(seed_data.migrations, "ensure_indexes", lambda db: None)
+    seed_data.seed(db, seed_data.parse_args([]))
+
+    machines = list(db.machines.find().sort("machineCode", 1))
+    assert [m["machineCode"] for m in machines] == ["CNC-01", "CONV-01", "PLC-01", "ROBOT-01"]
+    assert {m["status"] for m in machines} == {"active"}
+    assert all(m["installDate"] == m["createdAt"] for m in machines)
+
+    components = list(db.components.find())
+    assert len(components) == 40
+    assert {c["status"] for c in components} == {"good"}
+    assert not any("usageHours" in c or "usageCycles" in c for c in components)
+    assert db.components.find_one({"componentCode": "CNC-CMP-001"})["lifetimeHours"] == 20000  # Spindle Motor
+
+
+def test_realistic_flag_adds_synthetic_extras(db, monkeypatch):
+    monkeypatch.setattr(seed_data.migrations, "ensure_indexes", lambda db: None)
+    args = seed_data.parse_args(["--machines", "100", "--components-per-machine", "2", "--realistic"])
+    assert args.usage and args.random_install_dates and args.inactive_pct == 5
+    seed_data.seed(db, args)
+
+    assert db.machines.count_documents({"status": "inactive"}) > 0
+    assert db.components.count_documents({"usageHours": {"$exists": True}}) == 200
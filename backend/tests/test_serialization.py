@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import queries
+import serialization
+
+
+def test_naive_datetimes_are_encoded_as_utc():
+    assert serialization.dumps({"t": datetime(2025, 3, 5, 8, 30)}) == b'{"t":"2025-03-05T08:30:00Z"}'
+
+
+def test_component_and_work_order_dates_share_one_format(client, db, make_user):
+    _, headers = make_user("technician")
+    install = datetime(2024, 1, 2, 3, 4, 5)
+    machine_id = db.machines.insert_one({"machineCode": "M-01", "machineName": "Press"}).inserted_id
+    db.components.insert_many([
+        {"machineId": machine_id, "componentCode": "C-01", "componentName": "Motor", "installDate": install},
+        {"machineId": machine_id, "componentCode": "C-02", "componentName": "Belt", "installDate": " "},
+    ])
+    db.workorders.insert_one({"woNumber": "WO-2025-01-0001", "machineId": machine_id, "status": "open",
+                              "createdAt": install})
+
+    components = client.get(f"/api/machines/{machine_id}/components", headers=headers).get_json()
+    workorders = client.get("/api/workorders", headers=headers).get_json()
+
+    dates = {c["componentCode"]: c["installDate"] for c in components}
+    assert dates == {"C-01": "2024-01-02T03:04:05Z", "C-02": None}
+    assert workorders[0]["createdAt"] == "2024-01-02T03:04:05Z"
+    assert queries.blank_to_none("2024-01-02") == "2024-01-02"
@@ -0,0 +1,16 @@
+import app as appmod
+
+
+def test_start_app_runs_startup_tasks_once(monkeypatch):
+    started = []
+    monkeypatch.setattr(appmod, "_started", False)
+    monkeypatch.setenv("AUTO_ARCHIVE_DAYS", "30")
+    monkeypatch.setenv("SCHEDULER_INTERVAL_SECONDS", "300")
+    monkeypatch.setattr(appmod.archiver, "start_background_archiver", lambda db, **kw: started.append("archiver"))
+    monkeypatch.setattr(appmod.scheduler, "start_background_scheduler", lambda db, **kw: started.append("scheduler"))
+
+    assert appmod.start_app() is appmod.app
+    assert appmod.start_app() is appmod.app
+    assert appmod.create_app() is appmod.app
+
+    assert started == ["archiver", "scheduler"]
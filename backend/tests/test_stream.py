@@ -0,0 +1,43 @@
+import threading
+
+import app as appmod
+
+
+def stream_token(client, headers):
+    response = client.post("/api/stream/token", headers=headers)
+    assert response.status_code == 200
+    return response.get_json()["token"]
+
+
+def test_query_token_must_be_a_stream_token(client, make_user):
+    _, headers = make_user("operator")
+    login_token = headers["Authorization"].split(" ")[1]
+
+    assert client.get(f"/api/stream?token={login_token}").status_code == 401
+
+    token = stream_token(client, headers)
+    response = client.get(f"/api/stream?token={token}", buffered=False)
+    assert response.status_code == 200
+    response.close()
+    # Token stream tidak berlaku untuk API lain
+    assert client.get("/api/workorders", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_connections_over_the_cap_get_503(client, make_user, monkeypatch):
+    monkeypatch.setattr(appmod, "stream_slots", threading.BoundedSemaphore(2))
+    _, headers = make_user("operator")
+    token = stream_token(client, headers)
+
+    first = client.get(f"/api/stream?token={token}", buffered=False)
+    second = client.get(f"/api/stream?token={token}", buffered=False)
+    rejected = client.get(f"/api/stream?token={token}", buffered=False)
+    assert [first.status_code, second.status_code, rejected.status_code] == [200, 200, 503]
+    assert rejected.headers["Retry-After"]
+
+    # Koneksi yang ditutup mengembalikan slotnya (test client: tutup urut LIFO, 1 thread)
+    second.close()
+    again = client.get(f"/api/stream?token={token}", buffered=False)
+    assert again.status_code == 200
+    again.close()
+    first.close()
+    assert not appmod.event_broadcaster._subscribers
@@ -0,0 +1,76 @@
+import time
+
+import app as appmod
+
+
+def test_cache_hit_runs_no_user_query(client, db, make_user, queries_run):
+    _, headers = make_user("operator")
+    client.get("/api/machines", headers=headers)
+    queries_run.clear()
+    hits = appmod.user_cache.hits
+
+    client.get("/api/machines", headers=headers)
+
+    assert appmod.user_cache.hits == hits + 1
+    assert [q for q in queries_run if q[0] == "users"] == []
+
+
+def test_role_change_via_api_applies_immediately(client, db, make_user):
+    _, admin_headers = make_user("admin")
+    user, headers = make_user("supervisor")
+    assert client.post("/api/schedules/sweep", headers=headers).status_code == 200
+
+    response = client.put(f"/api/users/{user['_id']}", json={"role": "operator"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert client.post("/api/schedules/sweep", headers=headers).status_code == 403
+
+
+def test_deleted_user_via_api_is_rejected_immediately(client, db, make_user):
+    _, admin_headers = make_user("admin")
+    user, headers = make_user("technician")
+    assert client.get("/api/machines", headers=headers).status_code == 200
+
+    assert client.delete(f"/api/users/{user['_id']}", headers=admin_headers).status_code == 200
+
+    assert client.get("/api/machines", headers=headers).status_code == 401
+
+
+def test_change_from_another_worker_applies_after_ttl(client, db, make_user, monkeypatch):
+    user, headers = make_user("supervisor")
+    assert client.post("/api/schedules/sweep", headers=headers).status_code == 200
+
+    # Worker lain (cache lokalnya tidak tersentuh) menurunkan role user ini
+    db.users.update_one({"_id": user["_id"]}, {"$set": {"role": "operator"}})
+    assert client.post("/api/schedules/sweep", headers=headers).status_code == 200  # masih dari cache
+
+    expired = time.monotonic() + appmod.user_cache.ttl + 1
+    monkeypatch.setattr("cache.time.monotonic", lambda: expired)
+    assert client.post("/api/schedules/sweep", headers=headers).status_code == 403
+
+
+def test_async_app_serves_cache_hits_without_query(monkeypatch):
+    import asyncio
+    from datetime import datetime, timedelta
+
+    import jwt
+    import mongomock_motor
+
+    import async_app
+
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient().get_database("cmms_test_async")
+        monkeypatch.setattr(async_app, "db", db)
+        async_app.user_cache.clear()
+        user_id = (await db.users.insert_one({"username": "sari", "role": "supervisor"})).inserted_id
+        token = jwt.encode({"user_id": str(user_id), "exp": datetime.utcnow() + timedelta(hours=1)},
+                           async_app.app.config["SECRET_KEY"], algorithm="HS256")
+
+        first, _ = await async_app.user_from_token(token)
+        await db.users.delete_one({"_id": user_id})
+        cached, _ = await async_app.user_from_token(token)  # hit: tidak ke DB
+        async_app.user_cache.clear()
+        missing, error = await async_app.user_from_token(token)
+        return first["role"], cached["role"], missing, error
+
+    assert asyncio.run(scenario()) == ("supervisor", "supervisor", None, "User tidak ditemukan!")
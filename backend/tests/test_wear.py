@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import wear
+
+
+def life(lifetime_hours, lifetime_cycles, usage_hours, usage_cycles):
+    return wear.remaining_life(np.array(lifetime_hours, dtype=float), np.array(lifetime_cycles, dtype=float),
+                               np.array(usage_hours, dtype=float), np.array(usage_cycles, dtype=float),
+                               warning_pct=30, critical_pct=10)
+
+
+def test_remaining_life_thresholds():
+    # sisa 50% / tepat 30% / 11% / tepat 10% / 0% (pemakaian melebihi umur)
+    hours, _, pct, status = life([1000] * 5, [0] * 5, [500, 700, 890, 900, 1200], [0] * 5)
+
+    assert pct.tolist() == [50.0, 30.0, 11.0, 10.0, 0.0]
+    assert status.tolist() == [0, 1, 1, 2, 2]
+    assert hours.tolist() == [500, 300, 110, 100, 0]
+
+
+def test_remaining_life_uses_the_tighter_limit_and_flags_unknown_lifetime():
+    hours, cycles, pct, status = life([1000, 0], [100, 0], [100, 5], [95, 5])
+
+    assert pct[0] == 5.0 and status[0] == 2  # jam masih 90%, siklus tinggal 5%
+    assert hours[0] == 900 and cycles[0] == 5
+    assert np.isnan(pct[1]) and status[1] == -1
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "abc", -1])
+def test_validate_usage_rejects_non_finite_and_negative(value):
+    with pytest.raises(ValueError):
+        wear.validate_usage({"componentId": "65f000000000000000000001", "hours": value})
+
+
+def test_usage_ingest_updates_counters_and_status(client, db, make_user):
+    _, headers = make_user("technician")
+    comp_id = db.components.insert_one({"componentCode": "CMP-1", "status": "good",
+                                        "lifetimeHours": 1000, "lifetimeCycles": 0}).inserted_id
+    rows = [
+        {"componentId": str(comp_id), "hours": 750, "cycles": 10},
+        {"componentId": str(comp_id), "hours": 700},  # kiriman lama → $max tidak menurunkan
+        {"componentId": str(comp_id), "hours": "nan"},
+        {"componentId": "65f000000000000000000001", "hours": 1},
+    ]
+
+    response = client.post("/api/components/usage", json=rows, headers=headers)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [(e["row"], e["error"]) for e in body["errors"]] == [
+        (3, "hours harus angka"), (4, "Komponen tidak ditemukan")]
+    comp = db.components.find_one({"_id": comp_id})
+    assert comp["usageHours"] == 750 and comp["usageCycles"] == 10
+    assert comp["remainingHours"] == 250 and comp["remainingLifePct"] == 25.0
+    assert comp["status"] == "warning"
+
+
+def test_cleared_lifetime_removes_stale_remaining_values(db):
+    comp_id = db.components.insert_one({"componentCode": "CMP-2", "status": "warning", "lifetimeHours": 1000,
+                                        "usageHours": 800}).inserted_id
+    wear.compute_wear(db)
+    assert db.components.find_one({"_id": comp_id})["remainingLifePct"] == 20.0
+
+    db.components.update_one({"_id": comp_id}, {"$set": {"lifetimeHours": 0}})
+    assert wear.compute_wear(db)["updated"] == 1
+
+    comp = db.components.find_one({"_id": comp_id})
+    assert not any(field in comp for field in wear.REMAINING_FIELDS)
+    assert comp["status"] == "warning"  # status manual tidak diubah
+    assert wear.compute_wear(db)["updated"] == 0
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import counters
+import migrations
+
+CREATES = 400
+
+
+def wo_seq(number):
+    return int(number.rsplit("-", 1)[1])
+
+
+def test_parallel_creates_get_gap_free_numbers(client, db, make_user):
+    # WO_NUMBER_BLOCK_SIZE default 1: 1 nomor per round trip → urut tanpa celah di semua proses
+    _, headers = make_user("supervisor")
+    machine_id = db.machines.insert_one({"machineCode": "M-01", "machineName": "Press"}).inserted_id
+    body = {"machineId": str(machine_id), "type": "corrective", "priority": "high", "description": "Bocor"}
+
+    def create(_):
+        return client.post("/api/workorders", json=body, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(create, range(CREATES)))
+
+    assert [r.status_code for r in responses] == [201] * CREATES
+    numbers = sorted(wo_seq(r.get_json()["woNumber"]) for r in responses)
+    assert numbers == list(range(1, CREATES + 1))
+    assert db.workorders.count_documents({}) == CREATES
+
+
+def test_block_allocators_are_gap_free_per_block(db):
+    # Pre-alokasi (WO_NUMBER_BLOCK_SIZE > 1): tiap proses memegang blok sendiri, jadi urutan
+    # tanpa celah hanya dijamin per blok; gabungan semua proses tetap unik dan, kalau semua
+    # blok habis terpakai, juga tanpa celah.
+    block = 10
+    allocators = [counters.WoNumberAllocator(db, block_size=block) for _ in range(4)]
+    now = datetime(2025, 3, 1)
+
+    def take(allocator):
+        return [wo_seq(allocator.next_number(now)) for _ in range(CREATES // len(allocators))]
+
+    with ThreadPoolExecutor(max_workers=len(allocators)) as pool:
+        per_process = list(pool.map(take, allocators))
+
+    for numbers in per_process:
+        for start in range(0, len(numbers), block):
+            chunk = numbers[start:start + block]
+            assert chunk == list(range(chunk[0], chunk[0] + len(chunk)))
+            assert chunk[0] % block == 1  # blok dimulai di batas reserve_block
+    merged = sorted(n for numbers in per_process for n in numbers)
+    assert merged == list(range(1, CREATES + 1))
+
+
+def test_migration_renumbers_duplicates_before_unique_index(db):
+    created = datetime(2025, 1, 5)
+    db.workorders.insert_many([
+        {"woNumber": "WO-2025-01-0001", "createdAt": created},
+        {"woNumber": "WO-2025-01-0001", "createdAt": created.replace(day=6)},
+        {"woNumber": "WO-2025-01-0001", "createdAt": created.replace(day=7)},
+        {"woNumber": "WO-2025-01-0002", "createdAt": created.replace(day=8)},
+    ])
+
+    # Migrasi 1 lalu 2, urutan yang sama dengan migrate() di database versi 0
+    for _, _, func in migrations.MIGRATIONS[:2]:
+        func(db)
+
+    numbers = sorted(wo["woNumber"] for wo in db.workorders.find())
+    assert numbers == ["WO-2025-01-0001", "WO-2025-01-0002", "WO-2025-01-0003", "WO-2025-01-0004"]
+    # WO tertua tetap memegang nomor aslinya
+    assert db.workorders.find_one({"createdAt": created})["woNumber"] == "WO-2025-01-0001"
+    assert db.workorders.index_information()["woNumber_1"].get("unique")
+    # Counter lanjut dari nomor terakhir yang dibagikan
+    assert db.counters.find_one({"_id": "wo-2025-01"})["seq"] == 4
+
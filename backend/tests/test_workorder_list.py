@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def seed_legacy_workorders(db, count):
+    """WO lama tanpa snapshot nama → nama mesin/komponen harus dicari di machines/components."""
+    machines = db.machines.insert_many(
+        [{"machineCode": f"M-{i:02d}", "machineName": f"Mesin {i}"} for i in range(10)]).inserted_ids
+    components = db.components.insert_many(
+        [{"componentCode": f"C-{i:02d}", "componentName": f"Komponen {i}", "machineId": machines[i % 10]}
+         for i in range(20)]).inserted_ids
+    start = datetime(2025, 1, 1)
+    db.workorders.insert_many([{
+        "woNumber": f"WO-2025-01-{i + 1:04d}", "machineId": machines[i % 10], "componentId": components[i % 20],
+        "type": "corrective", "priority": "high", "description": "-", "status": "open",
+        "createdAt": start + timedelta(minutes=i),
+    } for i in range(count)])
+
+
+@pytest.mark.parametrize("limit", [5, 50])
+def test_list_query_count_does_not_grow_with_page_size(client, db, make_user, queries_run, limit):
+    _, headers = make_user("operator")
+    seed_legacy_workorders(db, 60)
+    client.get("/api/workorders?limit=1", headers=headers)  # user masuk cache
+    queries_run.clear()
+
+    response = client.get(f"/api/workorders?limit={limit}", headers=headers)
+
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert len(rows) == limit
+    assert all(row["machineName"].startswith("M-") and row["componentName"].startswith("C-") for row in rows)
+    # 1 query WO + 1 $in mesin + 1 $in komponen, berapapun barisnya (user dari cache)
+    assert sorted(queries_run) == [
+        ("components", "find"), ("machines", "find"), ("workorders", "find")]
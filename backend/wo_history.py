@@ -0,0 +1,85 @@
+# wo_history.py
+# Riwayat status WO di collection terpisah `workorder_events` (append-only).
+#
+# Dokumen WO hanya menyimpan:
+#   history     → HISTORY_KEEP entry terakhir ($push + $slice), cukup untuk detail WO
+#   statusTimes → {status: waktu pertama kali status itu tercapai}, dipakai tabel WO/arsip
+# Riwayat lengkap dibaca per halaman dari workorder_events (index woId, timestamp, _id).
+import os
+
+from pymongo import UpdateOne
+
+HISTORY_KEEP = int(os.environ.get("WO_HISTORY_KEEP", 10))
+
+
+def event_doc(wo_id, entry):
+    return {"woId": wo_id, **entry}
+
+
+def push_update(entry):
+    """Bagian update WO untuk 1 entry riwayat (digabung dengan $set milik pemanggil)."""
+    return {
+        "$push": {"history": {"$each": [entry], "$slice": -HISTORY_KEEP}},
+        "$min": {f"statusTimes.{entry['status']}": entry["timestamp"]}
+    }
+
+
+def initial_fields(entry):
+    """Field riwayat untuk WO baru (insert)."""
+    return {"history": [entry], "statusTimes": {entry["status"]: entry["timestamp"]}}
+
+
+def record(db, wo_id, entry):
+    """Simpan 1 entry ke workorder_events (dipanggil setelah update WO berhasil)."""
+    db.workorder_events.insert_one(event_doc(wo_id, entry))
+
+
+def record_many(db, pairs):
+    """pairs = [(wo_id, entry)], 1 insert_many."""
+    if pairs:
+        db.workorder_events.insert_many([event_doc(wo_id, entry) for wo_id, entry in pairs], ordered=False)
+
+
+def status_times(history):
+    times = {}
+    for h in history:
+        status, ts = h.get("status"), h.get("timestamp")
+        if status and ts is not None and (status not in times or ts < times[status]):
+            times[status] = ts
+    return times
+
+
+def migrate_embedded_history(db, batch_size=500):
+    """
+    Salin array history lama ke workorder_events lalu potong jadi HISTORY_KEEP entry.
+    Upsert per (woId, status, timestamp, by) → aman dijalankan ulang kalau terputus.
+    """
+    total = 0
+    for name in ("workorders", "workorders_archive"):
+        collection = db[name]
+        last_id = None
+        while True:
+            query = {"statusTimes": {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = list(collection.find(query, {"history": 1}).sort("_id", 1).limit(batch_size))
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+
+            event_ops = []
+            wo_ops = []
+            for doc in docs:
+                history = [h for h in doc.get("history") or [] if isinstance(h, dict)]
+                for h in history:
+                    key = {"woId": doc["_id"], "status": h.get("status"), "timestamp": h.get("timestamp"), "by": h.get("by")}
+                    event_ops.append(UpdateOne(key, {"$setOnInsert": event_doc(doc["_id"], h)}, upsert=True))
+                wo_ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+                    "history": history[-HISTORY_KEEP:],
+                    "statusTimes": status_times(history)
+                }}))
+            if event_ops:
+                db.workorder_events.bulk_write(event_ops, ordered=False)
+            collection.bulk_write(wo_ops, ordered=False)
+            total += len(docs)
+    return total
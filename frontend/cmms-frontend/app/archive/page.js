@@ -11,16 +11,21 @@ import { Bars3Icon, ArchiveBoxIcon } from "@heroicons/react/24/outline";
 export default function ArchivePage() {
   const [sidebarOpen, setSidebarOpen] = useState(false);
   const [archivedWO, setArchivedWO] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchArchived();
   }, []);
 
-  const fetchArchived = async () => {
+  // cursor kosong = halaman pertama; cursor terisi = tambah halaman berikutnya
+  const fetchArchived = async (cursor = null) => {
     try {
-      const res = await axiosInstance.get("http://localhost:5000/api/workorders/archive");
-      setArchivedWO(res.data);
+      const res = await axiosInstance.get("http://localhost:5000/api/workorders/archive", {
+        params: cursor ? { cursor } : {}
+      });
+      setArchivedWO(prev => (cursor ? [...prev, ...res.data] : res.data));
+      setNextCursor(res.headers["x-next-cursor"] || null);
       setLoading(false);
     } catch (err) {
       alert("Gagal memuat arsip: " + (err.response?.data?.error || err.message));
@@ -35,9 +40,9 @@ export default function ArchivePage() {
   };
 
   const getTimestamp = (wo, status) => {
-    if (!wo.history) return "-";
-    const entry = wo.history.find(h => h.status === status);
-    return entry && entry.timestamp ? formatDate(entry.timestamp) : "-";
+    // statusTimes = waktu pertama kali WO mencapai status tsb (dari backend)
+    const timestamp = wo.statusTimes?.[status];
+    return timestamp ? formatDate(timestamp) : "-";
   };
 
   const handleRestore = async (wo) => {
@@ -147,6 +152,16 @@ export default function ArchivePage() {
                 </tbody>
               </table>
             </div>
+            {nextCursor && (
+              <div className="p-6 text-center border-t">
+                <button
+                  onClick={() => fetchArchived(nextCursor)}
+                  className="bg-gray-800 hover:bg-gray-900 text-white px-6 py-2 rounded-lg text-sm font-bold shadow-md transition"
+                >
+                  Muat Lebih Banyak
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
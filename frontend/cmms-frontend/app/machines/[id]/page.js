@@ -156,13 +156,34 @@ export default function MachineDetailPage() {
                     <div className="bg-gray-50 p-4 rounded-xl text-center">
                       <p className="text-sm text-gray-500">Umur (Jam)</p>
                       <p className="text-2xl font-bold text-teal-600">{c.lifetimeHours.toLocaleString()}</p>
+                      <p className="text-xs text-gray-500 mt-1">Terpakai {c.usageHours.toLocaleString()}</p>
                     </div>
                     <div className="bg-gray-50 p-4 rounded-xl text-center">
                       <p className="text-sm text-gray-500">Umur (Siklus)</p>
                       <p className="text-2xl font-bold text-teal-600">{c.lifetimeCycles.toLocaleString()}</p>
+                      <p className="text-xs text-gray-500 mt-1">Terpakai {c.usageCycles.toLocaleString()}</p>
                     </div>
                   </div>
 
+                  {/* Sisa umur dihitung di backend (wear.py), tinggal ditampilkan */}
+                  {c.remainingLifePct !== null && (
+                    <div className="mt-6">
+                      <div className="flex justify-between text-sm text-gray-600 mb-1">
+                        <span>Sisa Umur</span>
+                        <span className="font-bold">{c.remainingLifePct}%</span>
+                      </div>
+                      <div className="w-full bg-gray-200 rounded-full h-3">
+                        <div
+                          className={`h-3 rounded-full ${
+                            c.status === "good" ? "bg-emerald-500" :
+                            c.status === "warning" ? "bg-amber-500" : "bg-red-600"
+                          }`}
+                          style={{ width: `${c.remainingLifePct}%` }}
+                        />
+                      </div>
+                    </div>
+                  )}
+
                   <div className="mt-6 text-sm text-gray-600">
                     <p className="flex items-center gap-2">
                       <Cog6ToothIcon className="w-5 h-5" />
@@ -1,6 +1,6 @@
 // app/page.js — VERSI FINAL & DEWA!
 "use client";
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import axiosInstance from "@/lib/axiosInstance";
 import { Bars3Icon } from "@heroicons/react/24/outline";
 import Sidebar from "@/components/Sidebar";
@@ -13,37 +13,60 @@ export default function Home() {
   const [sidebarOpen, setSidebarOpen] = useState(false);
   const [stats, setStats] = useState({ 
     total_wo: 0, 
-    overdue_tasks: 0 
+    overdue_tasks: 0,
+    by_status: {}
   });
   const [workorders, setWorkorders] = useState([]);
   const [machines, setMachines] = useState([]);
   const [loading, setLoading] = useState(true);
 
-  const fetchData = async () => {
+  const refreshing = useRef(false);
+  const refreshPending = useRef(false);
+
+  // background: true → update data tanpa spinner satu halaman (refresh dari SSE)
+  const fetchData = async ({ background = false } = {}) => {
     try {
-      setLoading(true);
+      if (!background) setLoading(true);
 
-      const [statsRes, woRes, machineRes] = await Promise.all([
-        axiosInstance.get("/maintenance-stats"),        // HAPUS FULL URL!
-        axiosInstance.get("/workorders"),               // HAPUS FULL URL!
+      const [summaryRes, woRes, machineRes] = await Promise.all([
+        axiosInstance.get("/dashboard/summary"),                // semua angka dashboard sekaligus
+        axiosInstance.get("/workorders", { params: { limit: 10 } }),
         axiosInstance.get("/machines")                  // HAPUS FULL URL!
       ]);
 
       // GABUNGKAN DATA DENGAN BENAR — HANYA SEKALI SET!
       setStats({
-        total_wo: woRes.data.length,                           // dari workorders
-        overdue_tasks: statsRes.data.overdue_maintenance || 0   // dari stats
+        total_wo: summaryRes.data.workorders.total,
+        overdue_tasks: summaryRes.data.schedules.overdue || 0,
+        by_status: summaryRes.data.workorders.by_status
       });
 
-      setWorkorders(woRes.data.slice(0, 10));
+      setWorkorders(woRes.data);
       setMachines(machineRes.data);
 
     } catch (err) {
       console.error("Error fetching data:", err);
-      // Kalau error, tetap kasih nilai default biar tidak blank
-      setStats(prev => ({ ...prev, total_wo: workorders.length }));
+      // Kalau error, tetap kasih nilai default biar tidak blank (refresh background: data lama tetap tampil)
+      if (!background) setStats(prev => ({ ...prev, total_wo: workorders.length }));
+    } finally {
+      if (!background) setLoading(false);
+    }
+  };
+
+  // Refresh dari SSE: maksimal 1 request jalan; event yang masuk selama itu → 1 refresh lagi sesudahnya
+  const refreshInBackground = async () => {
+    if (refreshing.current) {
+      refreshPending.current = true;
+      return;
+    }
+    refreshing.current = true;
+    try {
+      do {
+        refreshPending.current = false;
+        await fetchData({ background: true });
+      } while (refreshPending.current);
     } finally {
-      setLoading(false);
+      refreshing.current = false;
     }
   };
 
@@ -51,6 +74,55 @@ export default function Home() {
     fetchData();
   }, []);
 
+  // Update real-time (SSE): refresh dashboard hanya kalau ada WO / jadwal yang berubah.
+  // ?token= pakai token stream umur pendek (POST /stream/token), diminta ulang tiap sambung ulang.
+  useEffect(() => {
+    if (!localStorage.getItem("token")) return;
+
+    let timer = null;
+    let burstStart = null;
+    let retry = null;
+    let source = null;
+    let stopped = false;
+    // Gabungkan event beruntun jadi 1 refresh: tunggu 1 detik sepi, tapi paling lama 5 detik sejak event pertama
+    const scheduleRefresh = () => {
+      clearTimeout(timer);
+      burstStart = burstStart ?? Date.now();
+      const wait = Math.min(1000, Math.max(0, burstStart + 5000 - Date.now()));
+      timer = setTimeout(() => {
+        burstStart = null;
+        refreshInBackground();
+      }, wait);
+    };
+    const reconnect = () => {
+      if (!stopped) retry = setTimeout(connect, 10000);
+    };
+    const connect = async () => {
+      try {
+        const { data } = await axiosInstance.post("/stream/token");
+        if (stopped) return;
+        source = new EventSource(`http://localhost:5000/api/stream?token=${encodeURIComponent(data.token)}`);
+        source.addEventListener("workorders", scheduleRefresh);
+        source.addEventListener("maintenance_schedules", scheduleRefresh);
+        // Token stream sudah kadaluarsa / server penuh (503) → buka ulang dengan token baru
+        source.onerror = () => {
+          source.close();
+          reconnect();
+        };
+      } catch (err) {
+        reconnect();
+      }
+    };
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(timer);
+      clearTimeout(retry);
+      if (source) source.close();
+    };
+  }, []);
+
   if (loading) {
     return <LoadingSpinner/>; 
   }
@@ -82,15 +154,15 @@ export default function Home() {
           {/* SEKARANG TOTAL WO PASTI MUNCUL 100%! */}
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-5 gap-6 mb-8">
             <StatsCard title="Total WO" value={stats.total_wo} gradient="from-blue-500 to-blue-700" iconText="All" />
-            <StatsCard title="Open" value={workorders.filter(w => w.status === "open").length} gradient="from-indigo-500 to-indigo-700" iconText="New" />
-            <StatsCard title="In Progress" value={workorders.filter(w => w.status === "in_progress").length} gradient="from-orange-500 to-orange-600" iconText="Start" />
-            <StatsCard title="Completed" value={workorders.filter(w => w.status === "completed").length} gradient="from-green-500 to-green-700" iconText="Done" />
-            <StatsCard title="Closed" value={workorders.filter(w => w.status === "closed").length} gradient="from-gray-600 to-gray-800" iconText="Closed" />
+            <StatsCard title="Open" value={stats.by_status["open"] || 0} gradient="from-indigo-500 to-indigo-700" iconText="New" />
+            <StatsCard title="In Progress" value={stats.by_status["in_progress"] || 0} gradient="from-orange-500 to-orange-600" iconText="Start" />
+            <StatsCard title="Completed" value={stats.by_status["completed"] || 0} gradient="from-green-500 to-green-700" iconText="Done" />
+            <StatsCard title="Closed" value={stats.by_status["closed"] || 0} gradient="from-gray-600 to-gray-800" iconText="Closed" />
           </div>
 
           <div className="grid grid-cols-1 lg:grid-cols-3 gap-8">
             <div className="lg:col-span-2">
-              <WorkOrderTable workorders={workorders} onRefresh={fetchData} />
+              <WorkOrderTable workorders={workorders} onRefresh={() => fetchData()} />
             </div>
             <div>
               <MachineList machines={machines} />
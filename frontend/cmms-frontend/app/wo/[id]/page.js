@@ -13,6 +13,9 @@ export default function WorkOrderDetail() {
   const [wo, setWo] = useState(null);
   const [loading, setLoading] = useState(true);
   const [updating, setUpdating] = useState(false);
+  // Riwayat lengkap (per halaman) — wo.history dari detail hanya berisi entry terakhir
+  const [fullHistory, setFullHistory] = useState(null);
+  const [historyCursor, setHistoryCursor] = useState(null);
 
   useEffect(() => {
     if (id) fetchWO();
@@ -22,6 +25,8 @@ export default function WorkOrderDetail() {
     try {
       const res = await axiosInstance.get(`http://localhost:5000/api/workorders/${id}`);
       setWo(res.data);
+      setFullHistory(null);
+      setHistoryCursor(null);
       setLoading(false);
     } catch (err) {
       alert("Work Order tidak ditemukan!");
@@ -29,6 +34,18 @@ export default function WorkOrderDetail() {
     }
   };
 
+  const fetchHistory = async (cursor = null) => {
+    try {
+      const res = await axiosInstance.get(`http://localhost:5000/api/workorders/${id}/history`, {
+        params: { limit: 50, ...(cursor ? { cursor } : {}) }
+      });
+      setFullHistory((prev) => (cursor && prev ? [...prev, ...res.data] : res.data));
+      setHistoryCursor(res.headers["x-next-cursor"] || null);
+    } catch (err) {
+      alert("Gagal memuat riwayat: " + (err.response?.data?.error || err.message));
+    }
+  };
+
   const updateStatus = async (newStatus) => {
     if (updating) return;
     setUpdating(true);
@@ -125,10 +142,17 @@ export default function WorkOrderDetail() {
             </div>
 
             <div className="bg-white rounded-2xl shadow-lg p-8">
-              <h2 className="text-2xl font-bold text-gray-800 mb-6">Riwayat Status</h2>
+              <div className="flex justify-between items-center mb-6">
+                <h2 className="text-2xl font-bold text-gray-800">Riwayat Status</h2>
+                {fullHistory === null && (
+                  <button onClick={() => fetchHistory()} className="text-blue-600 hover:underline font-semibold text-sm">
+                    Lihat riwayat lengkap
+                  </button>
+                )}
+              </div>
               <div className="space-y-4">
-                {wo.history?.length > 0 ? (
-                  wo.history.map((h, i) => (
+                {(fullHistory ?? wo.history)?.length > 0 ? (
+                  (fullHistory ?? wo.history).map((h, i) => (
                     <div key={i} className="flex items-center gap-4 pb-4 border-b last:border-0">
                       <div className="w-12 h-12 bg-blue-100 rounded-full flex items-center justify-center font-bold text-blue-700">{i + 1}</div>
                       <div className="flex-1">
@@ -141,6 +165,12 @@ export default function WorkOrderDetail() {
                 ) : (
                   <p className="text-center py-8 text-gray-500">Belum ada riwayat</p>
                 )}
+                {historyCursor && (
+                  <button onClick={() => fetchHistory(historyCursor)}
+                    className="w-full bg-gray-100 hover:bg-gray-200 text-gray-700 font-semibold py-3 rounded-lg">
+                    Muat Lebih Banyak
+                  </button>
+                )}
               </div>
             </div>
           </div>
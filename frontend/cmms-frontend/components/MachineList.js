@@ -9,17 +9,18 @@ export default function MachineList({ machines: initialMachines }) {
   const [expandedMachine, setExpandedMachine] = useState(null); // machineId yang dibuka
   const [expandedComponents, setExpandedComponents] = useState({}); // { machineId: [components] }
 
-  // Ambil jumlah komponen real-time untuk semua mesin
+  // Ambil jumlah komponen semua mesin dalam 1 request
   useEffect(() => {
     const fetchComponentCounts = async () => {
       const counts = {};
-      for (const m of machines) {
-        try {
-          const res = await axiosInstance.get(`http://localhost:5000/api/machines/${m._id}/components`);
-          counts[m._id] = res.data.length;
-        } catch (err) {
-          counts[m._id] = 0;
+      try {
+        // Tanpa ids = semua mesin (daftar ini memang menampilkan semua mesin)
+        const res = await axiosInstance.get("http://localhost:5000/api/machines/component-stats");
+        for (const m of machines) {
+          counts[m._id] = res.data[m._id]?.total ?? 0;
         }
+      } catch (err) {
+        for (const m of machines) counts[m._id] = 0;
       }
       setComponentCounts(counts);
     };
@@ -114,6 +115,11 @@ export default function MachineList({ machines: initialMachines }) {
                             <div>
                               <span className="font-medium">Siklus:</span> {c.lifetimeCycles.toLocaleString()}
                             </div>
+                            {c.remainingLifePct != null && (
+                              <div className="col-span-2">
+                                <span className="font-medium">Sisa umur:</span> {c.remainingLifePct}%
+                              </div>
+                            )}
                           </div>
                         </div>
                       ))}
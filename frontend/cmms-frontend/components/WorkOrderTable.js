@@ -50,9 +50,9 @@ export default function WorkOrderTable({ workorders, onRefresh }) {
   };
 
   const getTimestamp = (wo, status) => {
-    if (!wo.history) return "-";
-    const entry = wo.history.find(h => h.status === status);
-    return entry && entry.timestamp ? formatDate(entry.timestamp) : "-";
+    // statusTimes = waktu pertama kali WO mencapai status tsb (dari backend)
+    const timestamp = wo.statusTimes?.[status];
+    return timestamp ? formatDate(timestamp) : "-";
   };
 
   return (